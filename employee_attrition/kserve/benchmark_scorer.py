@@ -0,0 +1,68 @@
+"""Per-request and per-row latency of the lookup table scorer vs the sklearn path.
+
+Both score the same employee_attrition_test.csv rows from the bundle in models/, as
+`{"instances": [...]}` payloads of each batch size, and must return the same labels.
+
+    python benchmark_scorer.py --batch-sizes 1 10 100 1000 10000
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_class import LookupTableScorer, load_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_DATA = os.path.join(HERE, "employee_attrition_test.csv")
+
+# the model logs every request at INFO, which would dominate what is measured
+logging.getLogger("model_class").setLevel(logging.WARNING)
+
+
+def load_records(limit):
+    df = pd.read_csv(TEST_DATA, nrows=limit)
+    opportunities = (df["Leadership Opportunities"] == "Yes") | (df["Innovation Opportunities"] == "Yes")
+    df["Opportunities"] = np.where(opportunities, "Yes", "No")
+    return df.drop(columns=["Leadership Opportunities", "Innovation Opportunities"]).to_dict(orient="records")
+
+
+def median_seconds(predict, payload, min_time_s):
+    predict(payload)
+    timings = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_time_s or len(timings) < 5:
+        call_started = time.perf_counter()
+        predict(payload)
+        timings.append(time.perf_counter() - call_started)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent timing each scorer per batch size")
+    parser.add_argument("--model-dir", default=os.path.join(HERE, "models"))
+    args = parser.parse_args()
+
+    model = load_model(args.model_dir)
+    scorer = LookupTableScorer(model)
+    records = load_records(max(args.batch_sizes))
+
+    print(f"{'batch':>7} {'sklearn us/req':>15} {'lookup us/req':>14} {'sklearn us/row':>15} {'lookup us/row':>14} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        payload = {"instances": records[:batch_size]}
+        if scorer.predict(payload) != model.predict(payload):
+            raise SystemExit(f"lookup table scorer and sklearn disagree at batch size {batch_size}")
+        sklearn_s = median_seconds(model.predict, payload, args.min_time)
+        lookup_s = median_seconds(scorer.predict, payload, args.min_time)
+        print(
+            f"{batch_size:>7} {sklearn_s * 1e6:>15.1f} {lookup_s * 1e6:>14.1f} "
+            f"{sklearn_s / batch_size * 1e6:>15.2f} {lookup_s / batch_size * 1e6:>14.2f} {sklearn_s / lookup_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
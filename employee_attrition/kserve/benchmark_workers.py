@@ -0,0 +1,160 @@
+"""Throughput and memory of the KServe server (server.py) per WORKERS setting.
+
+For each worker count, server.py is started with WORKERS=N on a free port and
+--clients client processes send single-row V1 requests built from
+employee_attrition_test.csv over keep-alive connections for --duration seconds.
+
+Memory comes from /proc/<pid>/smaps_rollup of every server worker at the end of each
+run: USS is the memory private to a worker, PSS splits shared pages (the memory-mapped
+model bundle, the interpreter and library code) between the processes sharing them.
+
+    python benchmark_workers.py --workers 1 2 4 8 --duration 10
+    python benchmark_workers.py --workers 4 --scorer sklearn
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_DATA = os.path.join(HERE, "employee_attrition_test.csv")
+MODEL_NAME = "employee-attrition"
+
+
+def load_bodies(limit):
+    df = pd.read_csv(TEST_DATA, nrows=limit)
+    opportunities = (df["Leadership Opportunities"] == "Yes") | (df["Innovation Opportunities"] == "Yes")
+    df["Opportunities"] = np.where(opportunities, "Yes", "No")
+    records = df.drop(columns=["Leadership Opportunities", "Innovation Opportunities"]).to_dict(orient="records")
+    return [json.dumps({"instances": [record]}) for record in records]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_mb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def server_workers(pid):
+    """Pids of the processes serving requests: the spawned uvicorn workers, or the server itself."""
+    workers = []
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        for child in f.read().split():
+            with open(f"/proc/{child}/cmdline", "rb") as cmdline:
+                if b"spawn_main" in cmdline.read():
+                    workers.append(int(child))
+    return workers or [pid]
+
+
+def start_server(workers, port, scorer, model_dir):
+    env = dict(os.environ, WORKERS=str(workers), SCORER=scorer, MODEL_DIR=model_dir)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "server.py"), "--http_port", str(port), "--grpc_port", str(free_port())],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"server.py exited with {server.returncode} for WORKERS={workers}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", f"/v1/models/{MODEL_NAME}")
+            if connection.getresponse().status == 200 and len(server_workers(server.pid)) == workers:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.kill()
+    raise SystemExit(f"server.py did not become ready with WORKERS={workers}")
+
+
+def client(port, bodies, duration_s, start, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    path = f"/v1/models/{MODEL_NAME}:predict"
+    headers = {"Content-Type": "application/json"}
+    start.wait()
+    requests = 0
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        connection.request("POST", path, body=bodies[requests % len(bodies)], headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"server answered {response.status}")
+        requests += 1
+    results.put(requests)
+
+
+def run(workers, clients, bodies, duration_s, scorer, model_dir):
+    port = free_port()
+    server = start_server(workers, port, scorer, model_dir)
+    try:
+        start, results = multiprocessing.Event(), multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=client, args=(port, bodies, duration_s, start, results)) for _ in range(clients)]
+        for process in processes:
+            process.start()
+        # let every worker see traffic before the clock starts
+        time.sleep(2)
+        start.set()
+        requests = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        memory = [memory_mb(pid) for pid in server_workers(server.pid)]
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    return {
+        "requests_s": requests / duration_s,
+        "uss_mb": np.mean([m["uss"] for m in memory]),
+        "pss_mb": np.mean([m["pss"] for m in memory]),
+        "rss_mb": np.mean([m["rss"] for m in memory]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count()}))
+    parser.add_argument("--clients", type=int, default=2 * os.cpu_count(), help="concurrent client processes")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per run")
+    parser.add_argument("--scorer", choices=["lookup", "sklearn"], default="lookup")
+    parser.add_argument("--model-dir", default=os.path.join(HERE, "models"))
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+
+    bodies = load_bodies(args.records)
+    print(f"{os.cpu_count()} cores, {args.clients} clients, SCORER={args.scorer}")
+    print(f"{'workers':>7} {'req/s':>9} {'scaling':>8} {'USS MB/worker':>14} {'PSS MB/worker':>14} {'RSS MB/worker':>14}")
+    baseline = None
+    for workers in args.workers:
+        result = run(workers, args.clients, bodies, args.duration, args.scorer, args.model_dir)
+        baseline = baseline or result["requests_s"]
+        print(
+            f"{workers:>7} {result['requests_s']:>9.0f} {result['requests_s'] / baseline:>7.2f}x "
+            f"{result['uss_mb']:>14.1f} {result['pss_mb']:>14.1f} {result['rss_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Single-file model bundle: a JSON manifest followed by raw little-endian arrays.
+
+Layout:
+
+    b"EABUNDLE" | uint32 format version | uint64 manifest length | manifest JSON
+    | padding to 64 bytes | arrays, each starting on a 64-byte boundary
+
+The manifest lists every array as {"offset", "dtype", "shape"} (offset from the start
+of the array region) next to the plain JSON metadata, and carries a sha256 over the
+manifest (without the checksum itself) and the array region. Arrays are read as views
+over a read-only memory map, so loading copies nothing and processes serving the same
+file share its pages through the page cache.
+"""
+import hashlib
+import json
+import math
+import struct
+
+import numpy as np
+
+MAGIC = b"EABUNDLE"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<IQ")
+ALIGN = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _checksum(manifest, data):
+    digest = hashlib.sha256(json.dumps({k: v for k, v in manifest.items() if k != "sha256"}, sort_keys=True).encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def write_bundle(path, metadata, arrays):
+    """Write `arrays` (name -> ndarray) and JSON-serializable `metadata` to one file."""
+    specs, chunks, offset = {}, [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder("<"))
+        offset = _aligned(offset)
+        specs[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        chunks.append((offset, array.tobytes()))
+        offset += array.nbytes
+    data = bytearray(offset)
+    for start, raw in chunks:
+        data[start:start + len(raw)] = raw
+
+    manifest = {"format_version": FORMAT_VERSION, "arrays": specs, **metadata}
+    manifest["sha256"] = _checksum(manifest, data)
+    manifest_bytes = json.dumps(manifest).encode()
+
+    header_length = len(MAGIC) + HEADER.size + len(manifest_bytes)
+    with open(path, "wb") as file:
+        file.write(MAGIC + HEADER.pack(FORMAT_VERSION, len(manifest_bytes)) + manifest_bytes)
+        file.write(b"\0" * (_aligned(header_length) - header_length))
+        file.write(data)
+
+
+def read_bundle(path, verify=True):
+    """(manifest, arrays) with every array a read-only view over a memory map of `path`."""
+    mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(mapped[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a model bundle")
+    version, manifest_length = HEADER.unpack(bytes(mapped[len(MAGIC):len(MAGIC) + HEADER.size]))
+    if version > FORMAT_VERSION:
+        raise ValueError(f"{path} has bundle format {version}, this reader supports up to {FORMAT_VERSION}")
+    manifest_start = len(MAGIC) + HEADER.size
+    manifest = json.loads(bytes(mapped[manifest_start:manifest_start + manifest_length]))
+    data = mapped[_aligned(manifest_start + manifest_length):]
+
+    if verify and _checksum(manifest, data) != manifest["sha256"]:
+        raise ValueError(f"{path} failed its checksum, the bundle is corrupt or was modified")
+
+    arrays = {
+        name: np.frombuffer(data, dtype=spec["dtype"], count=math.prod(spec["shape"]), offset=spec["offset"]).reshape(spec["shape"])
+        for name, spec in manifest["arrays"].items()
+    }
+    return manifest, arrays
@@ -1,6 +1,13 @@
 import pandas as pd
 import numpy as np
 import logging
+import os
+import pickle
+import time
+import sklearn
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+from bundle import read_bundle, write_bundle
 
 # configure logging
 logging.basicConfig(
@@ -11,6 +18,11 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+COLUMNS_TO_ENCODE = ['Work-Life Balance', 'Job Satisfaction', 'Performance Rating', 'Education Level', 'Job Level', 'Company Size', 'Company Reputation', 'Employee Recognition']
+BOOL_COLUMNS = ['Overtime', 'Remote Work', 'Opportunities']
+# inclusive Monthly Income ranges of buckets 0..4
+INCOME_BINS = [(1200, 10000), (10001, 20000), (20001, 35000), (35001, 50000), (50001, np.inf)]
+
 class EmployeeAttritionModel:
     def __init__(self, model, scaler, encoder, column_names, categories):
         self.model = model
@@ -20,29 +32,28 @@ class EmployeeAttritionModel:
         self.categories = categories
 
     def predict(self, payload):
-        logger.info('Raw data recieved from kserve: %s', payload)
-
         if "instances" not in payload:
             logger.error("Payload missing 'instances' key ")
             raise ValueError("Payload must contain 'instances' key")
         
         instances = payload["instances"]
-        logger.info("Extracted instances: %s ", instances)
+        logger.info("Scoring %d instances", len(instances))
+        logger.debug("Extracted instances: %s ", instances)
 
-        X = pd.DataFrame(instances, columns=self.column_names, index=[0])
-        logger.info("Dataframe: %s", X)
+        # one row per instance, every step below works on the whole batch at once
+        X = pd.DataFrame.from_records(instances, columns=self.column_names)
         
         # apply encoding
-        columns_to_encode = ['Work-Life Balance', 'Job Satisfaction', 'Performance Rating', 'Education Level', 'Job Level', 'Company Size', 'Company Reputation', 'Employee Recognition']
-        X[columns_to_encode] = self.encoder.transform(X[columns_to_encode]).astype('int')
+        X[COLUMNS_TO_ENCODE] = self.encoder.transform(X[COLUMNS_TO_ENCODE]).astype('int')
 
         # numerical encoder
-        emp_bool_map = ['Overtime', 'Remote Work', 'Opportunities']
-        for col in emp_bool_map: 
+        for col in BOOL_COLUMNS:
             X[col] = X[col].map({'No': 0, 'Yes': 1})
         
         # feature engg: monthly income mapping
-        X['Monthly Income'] = X['Monthly Income'].map(lambda x: self.monthly_income_mapping(x))
+        X['Monthly Income'] = self.monthly_income_mapping(X['Monthly Income'])
+        logger.debug("Dataframe: %s", X)
+
         # scale the data
         X = self.scaler.transform(X)
 
@@ -50,17 +61,161 @@ class EmployeeAttritionModel:
         return {"predictions": predictions.tolist()} # kserve compatible response
 
 
-    def monthly_income_mapping(self, income):
-        if 1200 <= income <= 10000:
-            return 0
-        elif 10001 <= income <= 20000:
-            return 1
-        elif 20001 <= income <= 35000:
-            return 2
-        elif 35001 <= income <= 50000:
-            return 3
-        elif income >= 50001:
-            return 4
-        else:
-            return -1  # Handle any unexpected values
+    @staticmethod
+    def monthly_income_mapping(income):
+        """Income bucket per value: 1200-10000 -> 0, ... 50001+ -> 4, anything else -> -1."""
+        income = np.asarray(income, dtype=float)
+        conditions = [(income >= low) & (income <= high) for low, high in INCOME_BINS]
+        return np.select(conditions, range(len(INCOME_BINS)), default=-1)
+
+
+class LookupTableScorer:
+    """The encoder, scaler and logistic regression of an EmployeeAttritionModel folded into per-feature terms.
+
+    Every feature enters the logit linearly, as coef * (x - mean) / scale. For the
+    categorical, Yes/No and income bucket features the contribution of every possible
+    code is precomputed into a table, numeric features keep a single folded weight, and
+    the means end up in one bias. A row is scored with one lookup or multiply-add per
+    feature and one sigmoid, with the same labels as the sklearn path.
+    """
+
+    def __init__(self, attrition_model):
+        model, scaler = attrition_model.model, attrition_model.scaler
+        if not isinstance(model, LogisticRegression) or len(model.classes_) != 2:
+            raise TypeError("The lookup table scorer needs a binary LogisticRegression")
+        weights = np.asarray(model.coef_[0], dtype=float) / np.asarray(scaler.scale_, dtype=float)
+        self.bias = float(model.intercept_[0] - np.dot(weights, scaler.mean_))
+        self.classes = model.classes_.tolist()
+
+        categories = dict(zip(COLUMNS_TO_ENCODE, attrition_model.categories))
+        self.tables = {}   # column -> {raw value: logit contribution}
+        self.weights = {}  # numeric column -> logit per unit
+        self.income_table = None
+        for column, weight in zip(attrition_model.column_names, weights):
+            if column in categories:
+                self.tables[column] = {category: weight * code for code, category in enumerate(categories[column])}
+            elif column in BOOL_COLUMNS:
+                self.tables[column] = {'No': 0.0, 'Yes': weight}
+            elif column == 'Monthly Income':
+                # contribution of buckets -1..4, indexed by bucket + 1
+                self.income_table = weight * np.arange(-1, len(INCOME_BINS))
+            else:
+                self.weights[column] = float(weight)
+
+    @staticmethod
+    def _lookup_error(rows, column, error):
+        """ValueError for a failed lookup, like the sklearn path raises for the same input."""
+        if any(column not in row for row in rows):
+            return ValueError(f"Instance is missing column {column!r}")
+        return ValueError(f"Found unknown category {error} in column {column!r}")
+
+    def logit(self, row):
+        """Logit of one instance; plain Python, cheaper than the array path for a single row."""
+        logit = self.bias
+        try:
+            for column, table in self.tables.items():
+                logit += table[row[column]]
+            # numbers may arrive as strings, the sklearn path converts them as well
+            for column, weight in self.weights.items():
+                logit += weight * float(row[column])
+            column = 'Monthly Income'
+            income = float(row[column])
+        except KeyError as e:
+            raise self._lookup_error([row], column, e) from None
+        bucket = next((i for i, (low, high) in enumerate(INCOME_BINS) if low <= income <= high), -1)
+        return logit + self.income_table[bucket + 1]
+
+    def logits(self, instances):
+        n = len(instances)
+        if n == 1:
+            return np.array([self.logit(instances[0])])
+        logit = np.full(n, self.bias)
+        try:
+            for column, table in self.tables.items():
+                logit += np.fromiter((table[row[column]] for row in instances), dtype=float, count=n)
+            for column, weight in self.weights.items():
+                logit += weight * np.fromiter((float(row[column]) for row in instances), dtype=float, count=n)
+            column = 'Monthly Income'
+            income = np.fromiter((float(row[column]) for row in instances), dtype=float, count=n)
+        except KeyError as e:
+            raise self._lookup_error(instances, column, e) from None
+        logit += self.income_table[EmployeeAttritionModel.monthly_income_mapping(income) + 1]
+        return logit
+
+    def predict_proba(self, instances):
+        """Probability of the positive class per instance."""
+        return 1.0 / (1.0 + np.exp(-self.logits(instances)))
+
+    def predict(self, payload):
+        if "instances" not in payload:
+            logger.error("Payload missing 'instances' key ")
+            raise ValueError("Payload must contain 'instances' key")
+        instances = payload["instances"]
+        logger.info("Scoring %d instances", len(instances))
+        # same decision rule as LogisticRegression.predict: positive class when the logit is above 0
+        negative, positive = self.classes
+        return {"predictions": [positive if logit > 0 else negative for logit in self.logits(instances).tolist()]}
+
+
+BUNDLE_FILE = "model.bundle"
+
+
+def save_bundle(path, model, scaler, column_names, categories):
+    """Write the fitted scaler and logistic regression with the feature layout to one bundle file."""
+    if not isinstance(model, LogisticRegression):
+        raise TypeError(f"Bundles hold a LogisticRegression, got {type(model).__name__}")
+    metadata = {
+        "model_type": "LogisticRegression",
+        "column_names": list(column_names),
+        "encoded_columns": COLUMNS_TO_ENCODE,
+        "categories": categories,
+        "classes": model.classes_.tolist(),
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    arrays = {
+        "scaler.mean": scaler.mean_,
+        "scaler.scale": scaler.scale_,
+        "model.coef": model.coef_,
+        "model.intercept": model.intercept_,
+    }
+    write_bundle(path, metadata, arrays)
+
+
+def load_bundle(path):
+    """EmployeeAttritionModel whose parameters are views over the memory-mapped bundle."""
+    manifest, arrays = read_bundle(path)
+    if manifest["model_type"] != "LogisticRegression":
+        raise ValueError(f"Unsupported model type in {path}: {manifest['model_type']}")
+    column_names = manifest["column_names"]
+
+    scaler = StandardScaler()
+    scaler.mean_ = arrays["scaler.mean"]
+    scaler.scale_ = arrays["scaler.scale"]
+    scaler.var_ = scaler.scale_ ** 2
+    scaler.n_features_in_ = len(column_names)
+    scaler.feature_names_in_ = np.array(column_names, dtype=object)
+    scaler.n_samples_seen_ = 0
+
+    model = LogisticRegression()
+    model.coef_ = arrays["model.coef"]
+    model.intercept_ = arrays["model.intercept"]
+    model.classes_ = np.array(manifest["classes"])
+    model.n_features_in_ = len(column_names)
+
+    # the categories fully define the encoder, fitting it on one row per column is enough
+    encoder = OrdinalEncoder(categories=manifest["categories"])
+    encoder.fit(pd.DataFrame([[categories[0] for categories in manifest["categories"]]], columns=manifest["encoded_columns"]))
+
+    return EmployeeAttritionModel(model, scaler, encoder, column_names, manifest["categories"])
+
 
+def load_model(model_dir):
+    """EmployeeAttritionModel from models/model.bundle, or the per-component pickles older model dirs hold."""
+    if os.path.exists(os.path.join(model_dir, BUNDLE_FILE)):
+        return load_bundle(os.path.join(model_dir, BUNDLE_FILE))
+    artifacts = {}
+    for name in ["model", "scaler", "encoder", "column_names", "categories"]:
+        with open(os.path.join(model_dir, f"{name}.pkl"), "rb") as f:
+            artifacts[name] = pickle.load(f)
+    return EmployeeAttritionModel(**artifacts)
@@ -1,8 +1,12 @@
 # emp_attr_model/server.py
-import pickle
 import os
 from kserve import Model, ModelServer
-from model_class import EmployeeAttritionModel
+from model_class import LookupTableScorer, load_model
+
+# server processes; each maps the same model bundle, whose pages the OS shares between them
+WORKERS = int(os.getenv("WORKERS", "1"))
+# "lookup" scores with the model folded into per-feature tables, "sklearn" runs encoder, scaler and model
+SCORER = os.getenv("SCORER", "lookup")
 
 class EmployeeAttritionServer(Model):
     def __init__(self, name):
@@ -13,26 +17,27 @@ class EmployeeAttritionServer(Model):
 
     def load(self):
         model_dir = os.getenv("MODEL_DIR", "/mnt/models")  # KServe mounts storageUri here
-        with open(os.path.join(model_dir, "model.pkl"), "rb") as f:
-            model = pickle.load(f)
-        with open(os.path.join(model_dir, "scaler.pkl"), "rb") as f:
-            scaler = pickle.load(f)
-        with open(os.path.join(model_dir, "encoder.pkl"), "rb") as f:
-            encoder = pickle.load(f)
-        with open(os.path.join(model_dir, "column_names.pkl"), "rb") as f:
-            column_names = pickle.load(f)
-        with open(os.path.join(model_dir, "categories.pkl"), "rb") as f:
-            categories = pickle.load(f)
-
-        self.model = EmployeeAttritionModel(model, scaler, encoder, column_names, categories)
+        model = load_model(model_dir)
+        self.model = LookupTableScorer(model) if SCORER == "lookup" else model
         self.ready = True
 
+    def __getstate__(self):
+        # kserve spawns its workers and pickles the model into each: send the configuration
+        # only, every worker maps the bundle itself and the page cache holds one copy
+        state = self.__dict__.copy()
+        state.update(model=None, ready=False)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.load()
+
     def predict(self, payload, headers=None):
         return self.model.predict(payload)  # Call your custom predict
 
 if __name__ == "__main__":
     model = EmployeeAttritionServer("employee-attrition")
     model.load()
-    ModelServer().start([model])
+    ModelServer(workers=WORKERS).start([model])
 
     
\ No newline at end of file
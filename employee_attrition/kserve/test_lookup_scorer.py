@@ -0,0 +1,85 @@
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_class import COLUMNS_TO_ENCODE, LookupTableScorer, load_model
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def random_record(rng: random.Random, categories) -> dict:
+    record = {
+        "Age": rng.randint(18, 70),
+        "Years at Company": rng.randint(0, 51),
+        "Monthly Income": rng.choice([0, 1199, 1200, 10000, 10000.5, 10001, 20000, 35000, 35001, 50000, 50001, 250000]),
+        "Number of Promotions": rng.randint(0, 4),
+        "Number of Dependents": rng.randint(0, 6),
+        "Company Tenure": rng.randint(1, 128),
+        "Overtime": rng.choice(["Yes", "No"]),
+        "Remote Work": rng.choice(["Yes", "No"]),
+        "Opportunities": rng.choice(["Yes", "No"]),
+    }
+    for col, values in zip(COLUMNS_TO_ENCODE, categories):
+        record[col] = rng.choice(values)
+    return record
+
+
+def sklearn_proba(model, records):
+    # the sklearn path up to the scaled matrix, to compare probabilities as well as labels
+    X = pd.DataFrame.from_records(records, columns=model.column_names)
+    X[COLUMNS_TO_ENCODE] = model.encoder.transform(X[COLUMNS_TO_ENCODE]).astype("int")
+    for col in ["Overtime", "Remote Work", "Opportunities"]:
+        X[col] = X[col].map({"No": 0, "Yes": 1})
+    X["Monthly Income"] = model.monthly_income_mapping(X["Monthly Income"])
+    return model.model.predict_proba(model.scaler.transform(X))[:, 1]
+
+
+def test_lookup_scorer_matches_sklearn_path():
+    model = load_model(MODEL_DIR)
+    scorer = LookupTableScorer(model)
+    rng = random.Random(0)
+    records = [random_record(rng, model.categories) for _ in range(2000)]
+
+    assert scorer.predict({"instances": records}) == model.predict({"instances": records})
+    np.testing.assert_allclose(scorer.predict_proba(records), sklearn_proba(model, records), rtol=0, atol=1e-12)
+    # single rows take the scalar path
+    for record in records[:200]:
+        assert scorer.predict({"instances": [record]}) == model.predict({"instances": [record]})
+
+
+def test_lookup_scorer_accepts_numbers_sent_as_strings():
+    model = load_model(MODEL_DIR)
+    scorer = LookupTableScorer(model)
+    rng = random.Random(2)
+    records = [random_record(rng, model.categories) for _ in range(50)]
+    for record in records:
+        record["Monthly Income"] = str(record["Monthly Income"])
+        record["Age"] = str(record["Age"])
+
+    assert scorer.predict({"instances": records}) == model.predict({"instances": records})
+    assert scorer.predict({"instances": records[:1]}) == model.predict({"instances": records[:1]})
+
+
+def test_lookup_scorer_rejects_missing_columns():
+    model = load_model(MODEL_DIR)
+    scorer = LookupTableScorer(model)
+    rng = random.Random(3)
+    for column in ["Monthly Income", "Company Tenure", "Overtime"]:
+        record = random_record(rng, model.categories)
+        del record[column]
+        for instances in ([record], [random_record(rng, model.categories), record]):
+            with pytest.raises(ValueError, match=f"missing column '{column}'"):
+                scorer.predict({"instances": instances})
+
+
+def test_lookup_scorer_rejects_unknown_categories():
+    model = load_model(MODEL_DIR)
+    scorer = LookupTableScorer(model)
+    record = random_record(random.Random(1), model.categories)
+    record["Job Level"] = "Intern"
+    for instances in ([record], [record, record]):
+        with pytest.raises(ValueError, match="Job Level"):
+            scorer.predict({"instances": instances})
@@ -1,11 +1,11 @@
 import pandas as pd
 import numpy as np
-import pickle
 import os
 from sklearn.preprocessing import OrdinalEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
+from model_class import BUNDLE_FILE, save_bundle
 
 # function-1
 def train_model():
@@ -83,20 +83,11 @@ def train_model():
     print("accuracy: %d", accuracy)
    
     # # save model 
-    # Save artifacts
+    # Save artifacts: one memory-mappable bundle instead of a pickle per component
     os.makedirs("models", exist_ok=True)
-    with open("models/model.pkl", "wb") as f:
-        pickle.dump(model, f)
-    with open("models/scaler.pkl", "wb") as f:
-        pickle.dump(scaler, f)
-    with open("models/encoder.pkl", "wb") as f:
-        pickle.dump(oe, f)
-    with open("models/column_names.pkl", "wb") as f:
-        pickle.dump(column_names, f)
-    with open("models/categories.pkl", "wb") as f:
-        pickle.dump(categories, f)
+    save_bundle(os.path.join("models", BUNDLE_FILE), model, scaler, column_names, categories)
 
-    print("Model and components saved to 'models/'")
+    print(f"Model bundle saved to 'models/{BUNDLE_FILE}'")
 
 if __name__ == "__main__":
     train_model()
\ No newline at end of file
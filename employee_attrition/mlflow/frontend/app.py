@@ -5,6 +5,7 @@ import pickle
 
 import mlflow
 import mlflow.pyfunc
+from artifact_cache import ArtifactCache
 
 
 app = Flask(__name__)
@@ -16,21 +17,27 @@ mlflow.set_tracking_uri("http://127.0.0.1:5000")
 model_name = "Employee Attrition Model"
 model_version = "4"
 run_id = "99f96adb9c53410aa78a161033ac379e"
-model = mlflow.pyfunc.load_model(f"models:/{model_name}/{model_version}")
+
+# a pinned version and run never change, so after the first start they load from local disk
+artifact_cache = ArtifactCache("frontend", mlflow.get_tracking_uri())
+model_key = f"{model_name}/{model_version}/model"
+preprocessor_uris = [f"runs:/{run_id}/preprocessor/{name}" for name in ["scaler.pkl", "feature_names.pkl", "ordinal_encoder.pkl"]]
+
+model = mlflow.pyfunc.load_model(artifact_cache.fetch(model_key, f"models:/{model_name}/{model_version}"))
 
 # download artifacts
-scaler_path = mlflow.artifacts.download_artifacts(f"runs:/{run_id}/preprocessor/scaler.pkl")
+scaler_path, feature_names_path, ordinal_encoder_path = [artifact_cache.fetch(uri, uri) for uri in preprocessor_uris]
 with open(scaler_path, "rb") as f:
     scaler = pickle.load(f)
 
-feature_names_path = mlflow.artifacts.download_artifacts(f"runs:/{run_id}/preprocessor/feature_names.pkl")
 with open(feature_names_path, "rb") as f:
     feature_names = pickle.load(f)
 
-ordinal_encoder_path = mlflow.artifacts.download_artifacts(f"runs:/{run_id}/preprocessor/ordinal_encoder.pkl")
 with open(ordinal_encoder_path, "rb") as f:
     ordinal_encoder = pickle.load(f)
 
+artifact_cache.evict(keep=[model_key] + preprocessor_uris)
+
 def preprocessing_input(input):
     # ordinal encoding
     cols_to_encode = ['Work-Life Balance', 'Job Satisfaction', 'Performance Rating', 'Education Level', 'Job Level', 'Company Size', 'Company Reputation', 'Employee Recognition']
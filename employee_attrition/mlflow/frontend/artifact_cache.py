@@ -0,0 +1,162 @@
+"""Local content-addressed cache of the MLflow artifacts the frontend loads.
+
+Artifacts are stored once per content digest under `objects/<sha256>/`. A small JSON
+index entry maps each key (model name and version, or a run artifact URI, which never
+change content) to its digest, so a restart loads from local disk without contacting
+the tracking server. Cached files are checked against their digest on every hit.
+
+Entries are evicted least recently used first once the objects exceed `max_bytes`.
+
+Several processes and tracking servers can share a directory: index entries are scoped
+to an owner and a tracking URI, and each cache only hits and evicts its own entries.
+Stored objects are shared by digest and deleted once no entry of any owner refers to them.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Iterable, Optional
+
+ARTIFACT_CACHE_DIR = os.environ.get("ARTIFACT_CACHE_DIR", os.path.expanduser("~/.cache/mlflow-artifacts"))
+ARTIFACT_CACHE_MAX_MB = float(os.environ.get("ARTIFACT_CACHE_MAX_MB", "2048"))
+# re-hash cached artifacts on every hit; "false" only compares their size
+ARTIFACT_CACHE_VERIFY = os.environ.get("ARTIFACT_CACHE_VERIFY", "true").lower() == "true"
+
+
+def tree_digest(path: str) -> str:
+    """sha256 over the relative paths and contents of every file below `path` (or of the file itself)."""
+    digest = hashlib.sha256()
+    files = [("", path)] if os.path.isfile(path) else sorted(
+        (os.path.relpath(os.path.join(root, name), path), os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+    for relative, full in files:
+        digest.update(relative.encode() + b"\0")
+        with open(full, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def tree_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def download_artifact(artifact_uri: str, dst_path: str) -> str:
+    import mlflow
+
+    return mlflow.artifacts.download_artifacts(artifact_uri=artifact_uri, dst_path=dst_path)
+
+
+class ArtifactCache:
+    def __init__(self, owner: str, tracking_uri: str, root: str = ARTIFACT_CACHE_DIR, max_bytes: int = int(ARTIFACT_CACHE_MAX_MB * 1024 * 1024), verify: bool = ARTIFACT_CACHE_VERIFY):
+        # entries are scoped to the process using the cache and the tracking server they came from
+        self.owner = owner
+        self.tracking_uri = tracking_uri.rstrip("/")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.verify = verify
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.root, "index", hashlib.sha256(f"{self.owner}\0{self.tracking_uri}\0{key}".encode()).hexdigest() + ".json")
+
+    def _owns(self, entry: dict) -> bool:
+        return entry.get("owner") == self.owner and entry.get("tracking_uri") == self.tracking_uri
+
+    def get(self, key: str) -> Optional[str]:
+        """Local path of a cached artifact, None when it is not cached or no longer intact."""
+        index_path = self._index_path(key)
+        entry = _read_json(index_path)
+        if entry is None:
+            return None
+        object_dir = os.path.join(self.root, "objects", entry["digest"])
+        path = os.path.join(object_dir, entry["path"])
+        if not os.path.exists(path):
+            return None
+        intact = tree_digest(path) == entry["digest"] if self.verify else tree_size(object_dir) == entry["size"]
+        if not intact:
+            print(f"Cached artifact {key} does not match its digest, discarding it")
+            shutil.rmtree(object_dir, ignore_errors=True)
+            os.remove(index_path)
+            return None
+        os.utime(index_path)  # last use, for eviction
+        return path
+
+    def fetch(self, key: str, artifact_uri: str, download: Callable[[str, str], str] = download_artifact) -> str:
+        """Local path of the artifact, downloaded and stored under its digest on a miss."""
+        path = self.get(key)
+        if path is not None:
+            return path
+
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.root, "objects"), prefix=".download-")
+        try:
+            downloaded = download(artifact_uri, tmp_dir)
+            relative = os.path.relpath(downloaded, tmp_dir)
+            digest = tree_digest(downloaded)
+            object_dir = os.path.join(self.root, "objects", digest)
+            try:
+                os.rename(tmp_dir, object_dir)
+            except OSError:
+                # same content already stored by an earlier key
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        index_path = self._index_path(key)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump({"key": key, "owner": self.owner, "tracking_uri": self.tracking_uri, "uri": artifact_uri, "digest": digest, "path": relative, "size": tree_size(object_dir), "cached_at": time.time()}, file)
+        os.replace(tmp_path, index_path)
+        return os.path.join(object_dir, relative)
+
+    def evict(self, keep: Iterable[str] = ()):
+        """Drop this owner's least recently used entries until its objects fit in max_bytes; `keep` keys stay."""
+        index_dir = os.path.join(self.root, "index")
+        if not os.path.isdir(index_dir):
+            return
+        entries = []
+        for name in os.listdir(index_dir):
+            path = os.path.join(index_dir, name)
+            entry = _read_json(path) if name.endswith(".json") else None
+            if entry is not None:
+                entries.append((os.path.getmtime(path), path, entry))
+        entries.sort(key=lambda item: item[0])
+
+        keep = set(keep)
+        own = [item for item in entries if self._owns(item[2])]
+        sizes = {entry["digest"]: entry["size"] for _, _, entry in own}
+        total = sum(sizes.values())
+        # references per object, from every owner sharing the directory and from this one
+        live, own_live = {}, {}
+        for _, _, entry in entries:
+            live[entry["digest"]] = live.get(entry["digest"], 0) + 1
+        for _, _, entry in own:
+            own_live[entry["digest"]] = own_live.get(entry["digest"], 0) + 1
+        for _, index_path, entry in own:
+            if total <= self.max_bytes:
+                break
+            if entry["key"] in keep:
+                continue
+            os.remove(index_path)
+            live[entry["digest"]] -= 1
+            own_live[entry["digest"]] -= 1
+            if own_live[entry["digest"]] == 0:
+                total -= sizes[entry["digest"]]
+                print(f"Evicted {entry['key']} ({entry['size'] / 1024 / 1024:.1f} MB) from the artifact cache")
+            if live[entry["digest"]] == 0:
+                shutil.rmtree(os.path.join(self.root, "objects", entry["digest"]), ignore_errors=True)
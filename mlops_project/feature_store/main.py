@@ -3,6 +3,7 @@ from feast.feature_store import FeatureStore
 from dotenv import load_dotenv
 from datetime import datetime
 import os
+import requests
 
 # Import all definitions from your features module
 from features import employee, employee_features_fv, employee_attrition_fs
@@ -15,11 +16,36 @@ load_dotenv()
 FEAST_SERVER_HOST = "localhost"
 FEAST_SERVER_PORT= 5050
 
+# prediction service to notify about registry changes (optional, only reaches the worker that
+# answers; services with FEAST_REGISTRY_URL set notice apply/materialize by polling the registry)
+PREDICTION_SERVICE_URL = os.environ.get("PREDICTION_SERVICE_URL")
+
 
 # FEAST_SERVER_HOST = "localhost"
 # FEAST_SERVER_PORT= 5050
 
 
+def registry_version(store: FeatureStore) -> str:
+    # the registry's last_updated timestamp changes on every apply
+    try:
+        return store.registry.proto().last_updated.ToJsonString()
+    except Exception as e:
+        print(f"Could not read registry version, falling back to current time: {e}")
+        return datetime.now().isoformat()
+
+
+def notify_prediction_service(path: str, payload: dict):
+    if not PREDICTION_SERVICE_URL:
+        return
+    try:
+        response = requests.post(f"{PREDICTION_SERVICE_URL}{path}", json=payload, timeout=5)
+        response.raise_for_status()
+        print(f"Notified prediction service: {path}")
+    except requests.exceptions.RequestException as e:
+        # the prediction service falls back to its TTL, so this is not fatal
+        print(f"Error notifying prediction service ({path}): {e}")
+
+
 def main():
     store = FeatureStore(repo_path=".")
     # Apply entities, feature views, and feature services
@@ -28,7 +54,9 @@ def main():
         employee_features_fv,
         employee_attrition_fs,
     ])
+    notify_prediction_service("/admin/feature-schema/invalidate", {"registry_version": registry_version(store)})
     store.materialize_incremental(end_date=datetime.now())
+    notify_prediction_service("/admin/online-features/invalidate", {})
     start_server(
         store=store, 
         host=FEAST_SERVER_HOST, 
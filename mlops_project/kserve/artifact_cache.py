@@ -0,0 +1,241 @@
+"""Local content-addressed cache of MLflow artifacts.
+
+Artifacts are stored once per content digest under `objects/<sha256>/`. A small JSON
+index entry maps each key (model name, version and artifact path, which never change
+content in the registry) to its digest, so a restart or a new worker loads from local
+disk without contacting the tracking server. The last version seen in each stage is
+remembered as well, so a stage URI still resolves while the registry is unreachable.
+
+Entries are evicted least recently used first once the objects exceed `max_bytes`.
+
+Several processes and tracking servers can share a directory: index entries are scoped
+to an owner and a tracking URI, and each cache only hits and evicts its own entries.
+Stored objects are shared by digest and deleted once no entry of any owner refers to them.
+
+Prefetch a version into the cache (init container, image build, after promotion):
+
+    python artifact_cache.py "Employee Attrition Model" --stage Production
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Iterable, Optional
+
+ARTIFACT_CACHE_DIR = os.environ.get("ARTIFACT_CACHE_DIR", os.path.expanduser("~/.cache/mlflow-artifacts"))
+ARTIFACT_CACHE_MAX_MB = float(os.environ.get("ARTIFACT_CACHE_MAX_MB", "2048"))
+# re-hash cached artifacts on every hit; "false" only compares their size
+ARTIFACT_CACHE_VERIFY = os.environ.get("ARTIFACT_CACHE_VERIFY", "true").lower() == "true"
+
+
+def tree_digest(path: str) -> str:
+    """sha256 over the relative paths and contents of every file below `path` (or of the file itself)."""
+    digest = hashlib.sha256()
+    files = [("", path)] if os.path.isfile(path) else sorted(
+        (os.path.relpath(os.path.join(root, name), path), os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+    for relative, full in files:
+        digest.update(relative.encode() + b"\0")
+        with open(full, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def tree_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _write_json_atomic(path: str, value: dict):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(value, file)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def download_artifact(artifact_uri: str, dst_path: str) -> str:
+    import mlflow
+
+    return mlflow.artifacts.download_artifacts(artifact_uri=artifact_uri, dst_path=dst_path)
+
+
+class ArtifactCache:
+    def __init__(self, owner: str, tracking_uri: str, root: str = ARTIFACT_CACHE_DIR, max_bytes: int = int(ARTIFACT_CACHE_MAX_MB * 1024 * 1024), verify: bool = ARTIFACT_CACHE_VERIFY):
+        # entries are scoped to the process using the cache and the tracking server they came from
+        self.owner = owner
+        self.tracking_uri = tracking_uri.rstrip("/")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.root, "index", hashlib.sha256(f"{self.owner}\0{self.tracking_uri}\0{key}".encode()).hexdigest() + ".json")
+
+    def _owns(self, entry: dict) -> bool:
+        return entry.get("owner") == self.owner and entry.get("tracking_uri") == self.tracking_uri
+
+    def _stage_path(self, model_name: str, stage: str) -> str:
+        return os.path.join(self.root, "stages", hashlib.sha256(f"{self.owner}\0{self.tracking_uri}\0{model_name}/{stage}".encode()).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Local path of a cached artifact, None when it is not cached."""
+        index_path = self._index_path(key)
+        entry = _read_json(index_path)
+        if entry is None:
+            return None
+        object_dir = os.path.join(self.root, "objects", entry["digest"])
+        path = os.path.join(object_dir, entry["path"])
+        if not os.path.exists(path):
+            return None
+        intact = tree_digest(path) == entry["digest"] if self.verify else tree_size(object_dir) == entry["size"]
+        if not intact:
+            # corrupted or truncated on disk: drop it, the caller downloads it again
+            print(f"Cached artifact {key} does not match its digest, discarding it")
+            shutil.rmtree(object_dir, ignore_errors=True)
+            os.remove(index_path)
+            return None
+        os.utime(index_path)  # last use, for eviction
+        return path
+
+    def fetch(self, key: str, artifact_uri: str, download: Callable[[str, str], str] = download_artifact) -> str:
+        """Local path of the artifact, downloaded and stored under its digest on a miss."""
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+        self.misses += 1
+
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.root, "objects"), prefix=".download-")
+        try:
+            downloaded = download(artifact_uri, tmp_dir)
+            relative = os.path.relpath(downloaded, tmp_dir)
+            digest = tree_digest(downloaded)
+            object_dir = os.path.join(self.root, "objects", digest)
+            try:
+                os.rename(tmp_dir, object_dir)
+            except OSError:
+                # same content already stored, by an earlier key or a concurrent worker
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        _write_json_atomic(self._index_path(key), {
+            "key": key,
+            "owner": self.owner,
+            "tracking_uri": self.tracking_uri,
+            "uri": artifact_uri,
+            "digest": digest,
+            "path": relative,
+            "size": tree_size(object_dir),
+            "cached_at": time.time(),
+        })
+        return os.path.join(object_dir, relative)
+
+    def remember_stage(self, model_name: str, stage: str, version: str, run_id: Optional[str] = None):
+        path = self._stage_path(model_name, stage)
+        if (_read_json(path) or {}).get("version") != version:
+            _write_json_atomic(path, {"model_name": model_name, "stage": stage, "version": version, "run_id": run_id})
+
+    def stage_version(self, model_name: str, stage: str) -> Optional[dict]:
+        """Last version seen in `stage`, as {"version", "run_id"}, for when the registry cannot be reached."""
+        return _read_json(self._stage_path(model_name, stage))
+
+    def entries(self, every_owner: bool = False):
+        index_dir = os.path.join(self.root, "index")
+        if not os.path.isdir(index_dir):
+            return []
+        entries = []
+        for name in os.listdir(index_dir):
+            path = os.path.join(index_dir, name)
+            entry = _read_json(path) if name.endswith(".json") else None
+            if entry is not None and (every_owner or self._owns(entry)):
+                entries.append((os.path.getmtime(path), path, entry))
+        return sorted(entries, key=lambda item: item[0])
+
+    def evict(self, keep: Iterable[str] = ()):
+        """Drop this owner's least recently used entries until its objects fit in max_bytes; `keep` keys stay."""
+        keep = set(keep)
+        entries = self.entries(every_owner=True)
+        own = [item for item in entries if self._owns(item[2])]
+        sizes = {entry["digest"]: entry["size"] for _, _, entry in own}
+        total = sum(sizes.values())
+        # references per object, from every owner sharing the directory and from this one
+        live, own_live = {}, {}
+        for _, _, entry in entries:
+            live[entry["digest"]] = live.get(entry["digest"], 0) + 1
+        for _, _, entry in own:
+            own_live[entry["digest"]] = own_live.get(entry["digest"], 0) + 1
+        for _, index_path, entry in own:
+            if total <= self.max_bytes:
+                break
+            if entry["key"] in keep:
+                continue
+            os.remove(index_path)
+            live[entry["digest"]] -= 1
+            own_live[entry["digest"]] -= 1
+            if own_live[entry["digest"]] == 0:
+                total -= sizes[entry["digest"]]
+                print(f"Evicted {entry['key']} ({entry['size'] / 1024 / 1024:.1f} MB) from the artifact cache")
+            if live[entry["digest"]] == 0:
+                shutil.rmtree(os.path.join(self.root, "objects", entry["digest"]), ignore_errors=True)
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum({entry["digest"]: entry["size"] for _, _, entry in entries}.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def main():
+    from mlflow.tracking import MlflowClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model_name")
+    parser.add_argument("--stage", default="Production")
+    parser.add_argument("--version", default=None, help="prefetch this version instead of the one in --stage")
+    parser.add_argument("--artifact", action="append", default=[], help="extra run artifact to prefetch, e.g. onnx/model.onnx")
+    parser.add_argument("--tracking-uri", default=os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000"), help="the predictor's MLFLOW_TRACKING_URI")
+    args = parser.parse_args()
+
+    client = MlflowClient(tracking_uri=args.tracking_uri)
+    if args.version is None:
+        model_version = client.get_latest_versions(args.model_name, stages=[args.stage])[0]
+    else:
+        model_version = client.get_model_version(args.model_name, args.version)
+
+    cache = ArtifactCache("kserve", args.tracking_uri)
+    started = time.perf_counter()
+    path = cache.fetch(f"{args.model_name}/{model_version.version}/model", f"models:/{args.model_name}/{model_version.version}")
+    for artifact in args.artifact:
+        cache.fetch(f"{args.model_name}/{model_version.version}/{artifact}", f"runs:/{model_version.run_id}/{artifact}")
+    if args.version is None:
+        cache.remember_stage(args.model_name, args.stage, model_version.version, model_version.run_id)
+    print(f"Cached version {model_version.version} at {path} in {time.perf_counter() - started:.1f}s: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
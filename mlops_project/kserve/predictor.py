@@ -1,58 +1,298 @@
+import json
+import threading
+import time
+import numpy as np
 import pandas as pd
 import mlflow
-from kserve import Model, ModelServer
+from mlflow.entities.model_registry import ModelVersion
+from mlflow.tracking import MlflowClient
+from kserve import InferOutput, InferRequest, InferResponse, Model, ModelServer
+from kserve.errors import InvalidInput
+from prometheus_client import Counter, Gauge
 import os
 from dotenv import load_dotenv
+from artifact_cache import ArtifactCache
 
 load_dotenv()
 
+# give up on a slow tracking server after seconds, not minutes of retries, and serve from the artifact cache
+os.environ.setdefault("MLFLOW_HTTP_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("MLFLOW_HTTP_REQUEST_MAX_RETRIES", "2")
+
 # MLFLOW_TRACKING_URI = os.environ.get("MLFLOW_ARTIFACT_URL", "../mlruns/0/models/m-3eebf8d27f0c4f039b54753013dd19bf/artifacts")
 MLFLOW_TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000")
 MODEL_NAME = "Employee Attrition Model"
 STAGE = "Production"
+# probability of the positive class at or above which a row is labelled as attrition
+PREDICTION_THRESHOLD = float(os.environ.get("PREDICTION_THRESHOLD", "0.5"))
+# how often the registry is checked for a newly promoted version
+MODEL_POLL_INTERVAL_S = float(os.environ.get("MODEL_POLL_INTERVAL_S", "60"))
+# "onnx" serves the onnx/model.onnx artifact logged at registration (EXPORT_ONNX=true) with onnxruntime
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "sklearn")
+ONNX_ARTIFACT = "onnx/model.onnx"
+# batch sizes scored, WARMUP_ROUNDS times each, before a loaded model is reported ready
+WARMUP_BATCH_SIZES = [int(size) for size in os.environ.get("WARMUP_BATCH_SIZES", "1,8,64,512").split(",")]
+WARMUP_ROUNDS = int(os.environ.get("WARMUP_ROUNDS", "3"))
+# server processes; each loads the serving version from the artifact cache and polls the registry itself
+WORKERS = int(os.environ.get("WORKERS", "1"))
+
+# employee_attrition_features (feature_store/features.py, all Int64) with the range of
+# values preprocessing produces, for synthetic warm-up rows; the image ships without feast
+FEATURE_SCHEMA = {
+    "Age": (0, 4), "Company Reputation": (0, 3), "Company Size": (0, 2), "Company Tenure": (2, 127),
+    "Education Level": (0, 4), "Employee Recognition": (0, 3), "Job Level": (0, 2), "Job Satisfaction": (0, 3),
+    "Monthly Income": (0, 4), "Number of Dependents": (0, 6), "Number of Promotions": (0, 4),
+    "Opportunities": (0, 1), "Overtime": (0, 1), "Performance Rating": (0, 3), "Remote Work": (0, 1),
+    "Work-Life Balance": (0, 3), "Years at Company": (1, 51),
+}
 
 mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
 
+# model versions already downloaded, shared by restarts and workers (ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_MB)
+artifact_cache = ArtifactCache("kserve", MLFLOW_TRACKING_URI)
+
+SERVING_VERSION = Gauge("attrition_model_serving_version", "Registry version of the model being served (1 for the current version)", ["version"])
+MODEL_RELOADS = Counter("attrition_model_reloads", "Times a newly promoted model version was swapped in")
+WARMUP_LATENCY = Gauge("attrition_model_warmup_ms", "Last warm-up round latency of the serving model per batch size", ["batch_size"])
+
+
+class OnnxPipeline:
+    """The parts of the sklearn pipeline the predictor uses, backed by an onnxruntime CPU session."""
+
+    def __init__(self, path):
+        import onnxruntime as ort
+
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.feature_names_in_ = np.array(json.loads(metadata["feature_names"]), dtype=object)
+        self.classes_ = np.array(json.loads(metadata["classes"]))
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_proba(self, df):
+        features = np.ascontiguousarray(df[list(self.feature_names_in_)].to_numpy(dtype=np.float32))
+        return self.session.run(["probabilities"], {self.input_name: features})[0]
+
+
 class EmployeeAttritionPrediction(Model):
-    def __init__(self, name, model_uri):
+    def __init__(self, name, model_uri, threshold=PREDICTION_THRESHOLD, poll_interval_s=MODEL_POLL_INTERVAL_S, backend=MODEL_BACKEND):
         super().__init__(name)
         self.model_uri = model_uri
+        self.backend = backend
+        self.threshold = threshold
+        self.poll_interval_s = poll_interval_s
         self.ready = False
+        # (version, model), replaced as a whole so a request keeps the model it started with
+        self._current = (None, None)
+        self._stop = threading.Event()
+        self._watcher = None
+        self.warmup_ms = {}
+
+    def __getstate__(self):
+        # kserve spawns its workers and pickles the model into each: send the configuration
+        # only, every worker loads from the artifact cache and starts its own watcher
+        state = self.__dict__.copy()
+        state.update(_current=(None, None), _stop=None, _watcher=None, warmup_ms={}, ready=False)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop = threading.Event()
+        self.load()
+
+    @property
+    def model(self):
+        return self._current[1]
+
+    @property
+    def version(self):
+        return self._current[0]
 
     def load(self):
         try:
             mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-            self.model = mlflow.sklearn.load_model(self.model_uri)
-            self.ready = True
+            self.reload()
+            self.ready = self.model is not None
         except Exception as e:
             print(f"Error during load: {e}")
-            self.ready = False
+            self.ready = self.model is not None
+        # keep checking the registry, also when the first load failed
+        self.start_watcher()
+
+    def registry_version(self):
+        """ModelVersion currently in the stage named by a models:/<name>/<stage> URI, None for any other URI."""
+        parts = self.model_uri.split("/")
+        if not self.model_uri.startswith("models:/") or len(parts) != 3 or parts[2].isdigit():
+            return None
+        try:
+            versions = MlflowClient().get_latest_versions(parts[1], stages=[parts[2]])
+        except Exception as e:
+            cached = artifact_cache.stage_version(parts[1], parts[2])
+            if cached is None:
+                raise
+            print(f"Registry unreachable, using the last known {parts[2]} version {cached['version']}: {e}")
+            return ModelVersion(parts[1], cached["version"], creation_timestamp=0, run_id=cached["run_id"])
+        if not versions:
+            return None
+        artifact_cache.remember_stage(parts[1], parts[2], versions[0].version, versions[0].run_id)
+        return versions[0]
 
+    @staticmethod
+    def cache_keys(model_version):
+        prefix = f"{model_version.name}/{model_version.version}"
+        return {"model": f"{prefix}/model", "onnx": f"{prefix}/{ONNX_ARTIFACT}"}
+
+    def load_pipeline(self, uri, model_version):
+        if model_version is None:
+            return mlflow.sklearn.load_model(uri)
+        keys = self.cache_keys(model_version)
+        if self.backend == "onnx":
+            try:
+                return OnnxPipeline(artifact_cache.fetch(keys["onnx"], f"runs:/{model_version.run_id}/{ONNX_ARTIFACT}"))
+            except Exception as e:
+                print(f"No usable ONNX model for version {model_version.version}, serving sklearn: {e}")
+        return mlflow.sklearn.load_model(artifact_cache.fetch(keys["model"], uri))
+
+    def reload(self) -> bool:
+        """Load and warm the registry's current version next to the serving one, then swap it in."""
+        model_version = self.registry_version()
+        version = model_version.version if model_version is not None else None
+        if self.model is not None and version == self.version:
+            return False
+
+        uri = self.model_uri if version is None else f"models:/{self.model_uri.split('/')[1]}/{version}"
+        model = self.load_pipeline(uri, model_version)
+        warmup_ms = self.warm_up(model)
+
+        previous = self.version
+        self._current = (version, model)
+        self.warmup_ms = warmup_ms
+        self.ready = True
+        for batch_size, ms in warmup_ms.items():
+            WARMUP_LATENCY.labels(batch_size=str(batch_size)).set(ms)
+        if previous is not None:
+            SERVING_VERSION.remove(str(previous))
+            MODEL_RELOADS.inc()
+        SERVING_VERSION.labels(version=str(version)).set(1)
+        print(f"Serving {uri} with {type(model).__name__} (version {version}, previously {previous})")
+        if model_version is not None:
+            artifact_cache.evict(keep=self.cache_keys(model_version).values())
+        return True
+
+    def warm_up(self, model, batch_sizes=WARMUP_BATCH_SIZES, rounds=WARMUP_ROUNDS):
+        """Score synthetic batches through the request path so the first real request runs at steady-state latency.
+
+        Returns the milliseconds of the last round per batch size.
+        """
+        feature_names = list(getattr(model, "feature_names_in_", FEATURE_SCHEMA))
+        rng = np.random.default_rng(0)
+        latencies = {}
+        for batch_size in batch_sizes:
+            columns = {name: rng.integers(*FEATURE_SCHEMA.get(name, (0, 0)), size=batch_size, endpoint=True) for name in feature_names}
+            instances = pd.DataFrame(columns).to_dict(orient="records")
+            for _ in range(rounds):
+                started = time.perf_counter()
+                self.predict_frame(model, pd.DataFrame(instances))
+                latencies[batch_size] = round((time.perf_counter() - started) * 1000, 3)
+        print(f"Warm-up latency (ms) by batch size: {latencies}")
+        return latencies
+
+    def start_watcher(self):
+        if self._watcher is None and self.poll_interval_s > 0:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.reload()
+            except Exception as e:
+                # keep serving the current version until the registry is reachable again
+                print(f"Error checking registry for a new model version: {e}")
+
+    def predict_frame(self, model, df):
+        # One vectorized probability pass for the whole batch, labels are derived from it
+        prediction_proba = model.predict_proba(df)[:, 1]
+        negative, positive = model.classes_
+        predictions = np.where(prediction_proba >= self.threshold, positive, negative)
+        return predictions, prediction_proba
 
     def predict(self, payload, headers=None):
-        print(f"Recieved payload: {payload}")
+        if isinstance(payload, InferRequest):
+            return self.predict_v2(payload)
 
         instances = payload.get("instances", [])
         if not instances:
             return {"error": "No instances provided."}
 
         df = pd.DataFrame(instances)
-        
         print(f"Input DataFrame shape: {df.shape}")
-        print(f"Input DataFrame columns: {df}")
-        
-        # Predict using MLflow model
-        predictions = self.model.predict(df)
-        prediction_proba = self.model.predict_proba(df)[0][1]
-        print(f"prediction: {predictions}")
-        print(f"prediction_proba: {prediction_proba}")
+
+        version, model = self._current
+        predictions, prediction_proba = self.predict_frame(model, df)
 
         # Return results as list
         return {
             "predictions": predictions.tolist(), 
-            "prediction_proba": prediction_proba.tolist()
+            "prediction_proba": prediction_proba.tolist(),
+            "model_version": version,
         }
 
+    def predict_v2(self, request: InferRequest) -> InferResponse:
+        """Open Inference Protocol request with one [rows, features] tensor.
+
+        The binary data extension saves formatting and parsing the values as JSON text,
+        but it is not zero-copy: kserve 0.15 decodes the raw bytes into a Python list
+        and `as_numpy` builds a new array from it. Column names come from the
+        `feature_names` request parameter, a JSON array string since parameters are
+        scalars, defaulting to the order the model was trained with.
+        """
+        if len(request.inputs) != 1:
+            raise InvalidInput(f"Expected a single [rows, features] input tensor, got {len(request.inputs)}")
+        features = request.inputs[0].as_numpy()
+        if features.ndim != 2:
+            raise InvalidInput(f"Expected a 2-D input tensor, got shape {list(features.shape)}")
+
+        version, model = self._current
+        parameters = request.parameters or {}
+        model_features = list(getattr(model, "feature_names_in_", []))
+        feature_names = parameters.get("feature_names")
+        if isinstance(feature_names, str):
+            try:
+                feature_names = json.loads(feature_names)
+            except ValueError:
+                raise InvalidInput(f"feature_names parameter is not a JSON array: {feature_names!r}")
+        feature_names = list(feature_names or model_features)
+        if len(feature_names) != features.shape[1]:
+            raise InvalidInput(f"Got {features.shape[1]} feature columns for {len(feature_names)} feature names")
+
+        df = pd.DataFrame(features, columns=feature_names, copy=False)
+        if model_features and feature_names != model_features:
+            df = df[model_features]
+        print(f"Input tensor shape: {features.shape}")
+
+        predictions, prediction_proba = self.predict_frame(model, df)
+
+        binary = bool(parameters.get("binary_data_output"))
+        outputs = []
+        for name, data in (("predictions", predictions.astype(np.int64)), ("prediction_proba", prediction_proba.astype(np.float64))):
+            output = InferOutput(name=name, shape=list(data.shape), datatype="INT64" if data.dtype == np.int64 else "FP64")
+            output.set_data_from_numpy(data, binary_data=binary)
+            outputs.append(output)
+        return InferResponse(
+            response_id=request.id,
+            model_name=self.name,
+            model_version=version,
+            infer_outputs=outputs,
+            use_binary_outputs=binary,
+        )
+
 
 if __name__ == "__main__":
     #  construct model uri from registry
@@ -60,7 +300,7 @@ if __name__ == "__main__":
     print(f"Using Mlflow tracking URI: {MLFLOW_TRACKING_URI}")
     print(f"Using model registry uri: {model_uri}")
 
-    server = ModelServer(http_port=8002)
+    server = ModelServer(http_port=8002, workers=WORKERS)
     print(f"mlflow-url in kserve: {os.environ.get("MLFLOW_ARTIFACT_URL")}")
 
     model = EmployeeAttritionPrediction(
@@ -68,5 +308,8 @@ if __name__ == "__main__":
         model_uri=model_uri
     )
     model.load()
+    if WORKERS > 1:
+        # the parent only hands the model to the workers, they serve and poll the registry
+        model.stop_watcher()
     server.start(models=[model])
 
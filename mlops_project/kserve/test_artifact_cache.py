@@ -0,0 +1,46 @@
+import os
+
+from artifact_cache import ArtifactCache
+
+
+def writer(content: str):
+    def download(artifact_uri, dst_path):
+        path = os.path.join(dst_path, "model.pkl")
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+    return download
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_tracking_servers_sharing_a_directory_do_not_collide(tmp_path):
+    staging = ArtifactCache("kserve", "http://staging:5000", root=str(tmp_path))
+    production = ArtifactCache("kserve", "http://production:5000/", root=str(tmp_path))
+    key, uri = "Employee Attrition Model/1/model", "models:/Employee Attrition Model/1"
+
+    assert read(staging.fetch(key, uri, writer("staging"))) == "staging"
+    assert production.get(key) is None
+    assert read(production.fetch(key, uri, writer("production"))) == "production"
+    assert read(staging.get(key)) == "staging"
+    assert ArtifactCache("kserve", "http://production:5000", root=str(tmp_path)).get(key) is not None
+
+
+def test_evict_only_drops_its_own_entries(tmp_path):
+    predictor = ArtifactCache("kserve", "http://mlflow:5000", root=str(tmp_path))
+    frontend = ArtifactCache("frontend", "http://mlflow:5000", root=str(tmp_path), max_bytes=0)
+    key, uri = "Employee Attrition Model/4/model", "models:/Employee Attrition Model/4"
+
+    predictor_path = predictor.fetch(key, uri, writer("same bytes"))
+    predictor.fetch("Employee Attrition Model/5/model", uri, writer("only the predictor"))
+    frontend_path = frontend.fetch(key, uri, writer("same bytes"))
+    assert frontend_path == predictor_path  # identical content is stored once
+
+    frontend.evict()
+    assert frontend.get(key) is None
+    assert read(predictor.get(key)) == "same bytes"
+    assert read(predictor.get("Employee Attrition Model/5/model")) == "only the predictor"
+    assert predictor.stats()["entries"] == 2
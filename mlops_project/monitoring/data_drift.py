@@ -10,10 +10,10 @@ alert_url="http://localhost:8001/alert"
 
 # Load historical and current data
 reference_data = pd.read_parquet("../feature_store/data/employee_preprocessed_data.parquet")
-live_data = pd.read_csv("../raw_data/input_data.csv")
+live_data = pd.read_parquet("../raw_data/input_data")  # append-only log written by the prediction service
 
 ref_data = reference_data.drop(columns=['employee_id', 'event_timestamp', 'attrition_label'], errors='ignore')
-curr_data = live_data.drop(columns=['employee_id'], errors='ignore')
+curr_data = live_data.drop(columns=['employee_id', 'request_id', 'logged_at'], errors='ignore')
 
 categorical_features = [
     'Age', 'Monthly Income', 'Work-Life Balance', 'Job Satisfaction', 'Performance Rating',
@@ -1,9 +1,9 @@
 # monitoring_service.py
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from pydantic import BaseModel
-from typing import Optional, Any
+from typing import Optional, Any, List, Dict
 import os
 from datetime import datetime, timezone
 import csv
@@ -33,27 +33,45 @@ class LogData(BaseModel):
     latency_ms: float
     status: str
     prediction: Optional[Any] = None # Use Any as prediction can be int, float, etc.
+    timestamp: Optional[str] = None # set by the sender when metrics are shipped in batches
+    stages_ms: Optional[Dict[str, float]] = None # per-stage latency breakdown of the request
 
 
-def _write_log(data: LogData):
+LOG_HEADER = ['timestamp', 'latency_ms', 'status', 'prediction', 'stages_ms']
+
+
+def _rotate_outdated_log():
+    # logs written before a column was added keep their own header in a separate file
+    with open(MONITOR_LOG_FILE, newline='') as file:
+        header = next(csv.reader(file), None)
+    if header != LOG_HEADER:
+        suffix = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        os.replace(MONITOR_LOG_FILE, f"{MONITOR_LOG_FILE}.{suffix}")
+
+
+def _write_logs(entries: List[LogData]):
+    if os.path.isfile(MONITOR_LOG_FILE):
+        _rotate_outdated_log()
     log_exists = os.path.isfile(MONITOR_LOG_FILE)
 
     with open(MONITOR_LOG_FILE, mode='a', newline='') as file:
         writer = csv.writer(file)
         if not log_exists:
-            writer.writerow(['timestamp', 'latency_ms', 'status', 'prediction'])  # header
-        writer.writerow([
-            datetime.now(datetime.timezone.utc).isoformat(),
-            data.latency_ms,
-            data.status,
-            data.prediction,
-        ])
+            writer.writerow(LOG_HEADER)  # header
+        for data in entries:
+            writer.writerow([
+                data.timestamp or datetime.now(timezone.utc).isoformat(),
+                data.latency_ms,
+                data.status,
+                data.prediction,
+                json.dumps(data.stages_ms) if data.stages_ms is not None else "",
+            ])
 
 
 @app.post("/log")
 async def log_inference(log_data: LogData):
     try:
-        _write_log(log_data)
+        _write_logs([log_data])
         print(f"Log received: {log_data.dict()}")
         return {"message": "Log recorded successfully"}
     except Exception as e:
@@ -61,6 +79,18 @@ async def log_inference(log_data: LogData):
         return {"error": "Failed to record log"}, 500
 
 
+@app.post("/log/batch")
+async def log_inference_batch(log_data: List[LogData]):
+    try:
+        _write_logs(log_data)
+        print(f"Logs received: {len(log_data)}")
+        return {"message": "Logs recorded successfully", "count": len(log_data)}
+    except Exception as e:
+        print(f"Error writing logs: {e}")
+        # a real 500, so the shipper counts the batch as failed instead of sent
+        raise HTTPException(status_code=500, detail="Failed to record logs")
+
+
 @app.get("/metrics")
 async def get_metrics():
     metrics = {}
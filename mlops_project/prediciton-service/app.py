@@ -1,32 +1,195 @@
-import json
+import asyncio
+import functools
+import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-import requests
-import pandas as pd
+import httpx
+import threading
+import importlib
 import time
-from sklearn.preprocessing import OrdinalEncoder
+from datetime import datetime, timezone
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import os
 from dotenv import load_dotenv
-
-
+from prediction_log import PredictionLogWriter, input_log_schema, prediction_log_schema
+from http_clients import DependencyClient
+from feature_cache import FeastRegistryWatcher, FeatureSchemaCache, OnlineFeatureCache
+from metrics_shipper import MetricsShipper
+from batcher import MicroBatcher
+from embedded_model import EmbeddedModel
+from preprocessing import CompiledPreprocessor, preprocess_records
+from stats import StageHistograms, StageTimer
+from result_cache import PredictionResultCache, RegistryVersionWatcher
+from resilience import CircuitBreaker, CircuitOpenError, hedged
+from v2_protocol import decode_infer_response, encode_infer_request
+
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 load_dotenv()
 
 FEAST_SERVER_URL = os.environ.get("FEAST_SERVER_URL", "http://localhost:5050") # Or the load balancer URL if on K8s
 KSERVE_URL = os.environ.get("KSERVE_URL", "http://localhost:8002/v1/models/mlops_employee_attrition:predict")
+# "v1" sends JSON instances, "v2" binary tensors (KSERVE_URL then points at /v2/models/<name>/infer)
+KSERVE_PROTOCOL = os.environ.get("KSERVE_PROTOCOL", "v1")
 MONITORING_URL = os.environ.get("MONITORING_URL", "http://localhost:8001")
-INPUT_FILE_PATH = "input_data.csv"
-PREDICTION_OUTPUT_FILE = "prediction_output.csv"
+FEATURE_SERVICE_NAME = os.environ.get("FEATURE_SERVICE_NAME", "employee_attrition_features")
+FEATURE_SCHEMA_TTL_S = float(os.environ.get("FEATURE_SCHEMA_TTL_S", "60")) # same as the registry cache_ttl_seconds
+ONLINE_FEATURE_CACHE_SIZE = int(os.environ.get("ONLINE_FEATURE_CACHE_SIZE", "100000"))
+ONLINE_FEATURE_CACHE_TTL_S = float(os.environ.get("ONLINE_FEATURE_CACHE_TTL_S", "3600"))
+# SQLAlchemy URL of the Feast SQL registry (feature_store.yaml `registry.path`); every worker
+# polls it and drops its feature caches after `feast apply` / `feast materialize`
+FEAST_REGISTRY_URL = os.environ.get("FEAST_REGISTRY_URL")
+FEAST_PROJECT = os.environ.get("FEAST_PROJECT", "mlops_project")
+FEAST_REGISTRY_POLL_INTERVAL_S = float(os.environ.get("FEAST_REGISTRY_POLL_INTERVAL_S", "30"))
+INPUT_LOG_DIR = os.environ.get("INPUT_LOG_DIR", "input_data")
+PREDICTION_LOG_DIR = os.environ.get("PREDICTION_LOG_DIR", "prediction_output")
+LOG_FLUSH_ROWS = int(os.environ.get("LOG_FLUSH_ROWS", "500"))
+LOG_FLUSH_INTERVAL_S = float(os.environ.get("LOG_FLUSH_INTERVAL_S", "5"))
+# rows waiting for a flush per log, the oldest are dropped beyond this
+LOG_MAX_BUFFER_ROWS = int(os.environ.get("LOG_MAX_BUFFER_ROWS", "100000"))
+
+# per-dependency timeouts (seconds) and connection/concurrency limits
+FEAST_TIMEOUT_S = float(os.environ.get("FEAST_TIMEOUT_S", "2"))
+KSERVE_TIMEOUT_S = float(os.environ.get("KSERVE_TIMEOUT_S", "5"))
+MONITORING_TIMEOUT_S = float(os.environ.get("MONITORING_TIMEOUT_S", "1"))
+FEAST_MAX_CONNECTIONS = int(os.environ.get("FEAST_MAX_CONNECTIONS", "20"))
+KSERVE_MAX_CONNECTIONS = int(os.environ.get("KSERVE_MAX_CONNECTIONS", "50"))
+MONITORING_MAX_CONNECTIONS = int(os.environ.get("MONITORING_MAX_CONNECTIONS", "10"))
+# deadline for a whole KServe call, including waiting for a free connection slot
+KSERVE_DEADLINE_S = float(os.environ.get("KSERVE_DEADLINE_S", os.environ.get("KSERVE_TIMEOUT_S", "5")))
+
+# KServe fails fast after repeated errors, and slow calls can be hedged to a second replica
+KSERVE_BREAKER_FAILURES = int(os.environ.get("KSERVE_BREAKER_FAILURES", "5"))
+KSERVE_BREAKER_RESET_S = float(os.environ.get("KSERVE_BREAKER_RESET_S", "10"))
+KSERVE_HEDGE_URL = os.environ.get("KSERVE_HEDGE_URL", "")
+KSERVE_HEDGE_AFTER_MS = float(os.environ.get("KSERVE_HEDGE_AFTER_MS", "100"))
+
+# "kserve" calls the KServe predictor, "embedded" loads the Production model from MLflow and scores in-process
+MODEL_MODE = os.environ.get("MODEL_MODE", "kserve")
+MLFLOW_TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000")
+MODEL_NAME = "Employee Attrition Model"
+MODEL_STAGE = "Production"
+MODEL_POLL_INTERVAL_S = float(os.environ.get("MODEL_POLL_INTERVAL_S", "60"))
+PREDICTION_THRESHOLD = float(os.environ.get("PREDICTION_THRESHOLD", "0.5")) # same as the KServe predictor
+MLFLOW_TIMEOUT_S = float(os.environ.get("MLFLOW_TIMEOUT_S", "2"))
+
+# model outputs per distinct model input row, emptied when the Production version changes
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "100000"))
+
+# coalescing of concurrent /predict rows into one KServe call
+KSERVE_BATCHING_ENABLED = os.environ.get("KSERVE_BATCHING_ENABLED", "true").lower() == "true"
+KSERVE_BATCH_MAX_SIZE = int(os.environ.get("KSERVE_BATCH_MAX_SIZE", "64"))
+KSERVE_BATCH_WAIT_MS = float(os.environ.get("KSERVE_BATCH_WAIT_MS", "5"))
+
+# background shipping of inference metrics
+METRICS_QUEUE_SIZE = int(os.environ.get("METRICS_QUEUE_SIZE", "10000"))
+METRICS_BATCH_SIZE = int(os.environ.get("METRICS_BATCH_SIZE", "200"))
+METRICS_FLUSH_INTERVAL_S = float(os.environ.get("METRICS_FLUSH_INTERVAL_S", "1"))
 
 print(f"FEAST_SERVER_URL: {FEAST_SERVER_URL}")
 
-print(f"FEAST_SERVER_URL: {FEAST_SERVER_URL}")
 
+# append-only request/prediction logs, flushed to parquet segments in the background
+input_log = PredictionLogWriter(INPUT_LOG_DIR, input_log_schema(), flush_rows=LOG_FLUSH_ROWS, flush_interval_s=LOG_FLUSH_INTERVAL_S, max_buffer_rows=LOG_MAX_BUFFER_ROWS)
+prediction_log = PredictionLogWriter(PREDICTION_LOG_DIR, prediction_log_schema(), flush_rows=LOG_FLUSH_ROWS, flush_interval_s=LOG_FLUSH_INTERVAL_S, max_buffer_rows=LOG_MAX_BUFFER_ROWS)
+
+# shared keep-alive clients, one pool per dependency
+feast_client = DependencyClient("feast", FEAST_TIMEOUT_S, FEAST_MAX_CONNECTIONS)
+kserve_client = DependencyClient("kserve", KSERVE_TIMEOUT_S, KSERVE_MAX_CONNECTIONS, deadline_s=KSERVE_DEADLINE_S)
+# one circuit breaker per KServe replica, the hedge replica is only raced against slow calls
+kserve_replicas = [
+    (url, CircuitBreaker(f"kserve {url}", KSERVE_BREAKER_FAILURES, KSERVE_BREAKER_RESET_S))
+    for url in (KSERVE_URL, KSERVE_HEDGE_URL) if url
+]
+monitoring_client = DependencyClient("monitoring", MONITORING_TIMEOUT_S, MONITORING_MAX_CONNECTIONS)
+metrics_shipper = MetricsShipper(
+    monitoring_client,
+    f"{MONITORING_URL}/log/batch",
+    max_queue=METRICS_QUEUE_SIZE,
+    batch_size=METRICS_BATCH_SIZE,
+    flush_interval_s=METRICS_FLUSH_INTERVAL_S,
+)
+
+embedded_model = EmbeddedModel(MODEL_NAME, MODEL_STAGE, MLFLOW_TRACKING_URI, MODEL_POLL_INTERVAL_S, PREDICTION_THRESHOLD) if MODEL_MODE == "embedded" else None
+
+result_cache = PredictionResultCache(RESULT_CACHE_SIZE) if RESULT_CACHE_ENABLED else None
+# with KServe serving the model, the Production version comes from the registry itself
+mlflow_client = DependencyClient("mlflow", MLFLOW_TIMEOUT_S, max_connections=2)
+registry_watcher = (
+    RegistryVersionWatcher(mlflow_client, MLFLOW_TRACKING_URI, MODEL_NAME, MODEL_STAGE, MODEL_POLL_INTERVAL_S)
+    if result_cache is not None and embedded_model is None else None
+)
+
+# per-stage latency histograms, one set per endpoint
+stage_latencies = {"predict": StageHistograms(), "predict_batch": StageHistograms()}
+
+# lookup tables for the single record preprocessing fast path
+compiled_preprocessor = CompiledPreprocessor()
+
+# model feature ordering per feature service, refreshed on TTL or registry change
+feature_schema_cache = FeatureSchemaCache(FEATURE_SCHEMA_TTL_S)
+# online feature vectors per employee, invalidated after materialization
+online_feature_cache = OnlineFeatureCache(ONLINE_FEATURE_CACHE_SIZE, ONLINE_FEATURE_CACHE_TTL_S)
 
-app = FastAPI()
+
+def on_feast_registry_change(registry_version: str):
+    if feature_schema_cache.set_registry_version(registry_version):
+        online_feature_cache.invalidate()
+
+
+feast_registry_watcher = (
+    FeastRegistryWatcher(FEAST_REGISTRY_URL, FEAST_PROJECT, on_feast_registry_change, FEAST_REGISTRY_POLL_INTERVAL_S)
+    if FEAST_REGISTRY_URL else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    input_log.start()
+    prediction_log.start()
+    for client in (feast_client, kserve_client, monitoring_client):
+        await client.start()
+    await metrics_shipper.start()
+    if feast_registry_watcher is not None:
+        await feast_registry_watcher.start()
+    if registry_watcher is not None:
+        await mlflow_client.start()
+        await registry_watcher.start()
+    if embedded_model is not None:
+        try:
+            await asyncio.to_thread(embedded_model.load_latest)
+        except Exception as e:
+            # the watcher keeps retrying, requests fail until a model is loaded
+            print(f"Error loading the Production model: {e}")
+        embedded_model.start()
+    if kserve_batcher is not None:
+        await kserve_batcher.start()
+    # pandas is only needed by the batch path and the log writers, import it once startup is done
+    threading.Thread(target=importlib.import_module, args=("pandas",), name="prewarm-pandas", daemon=True).start()
+    yield
+    if kserve_batcher is not None:
+        await kserve_batcher.close()
+    await metrics_shipper.close()
+    if feast_registry_watcher is not None:
+        await feast_registry_watcher.close()
+    if embedded_model is not None:
+        embedded_model.close()
+    if registry_watcher is not None:
+        await registry_watcher.close()
+        await mlflow_client.close()
+    for client in (feast_client, kserve_client, monitoring_client):
+        await client.close()
+    input_log.close()
+    prediction_log.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -38,157 +201,252 @@ app.add_middleware(
 )
 
 
-# ==== Define encoder logic same as your data-preparation.py ====
-encoder_columns = [
-    'Work-Life Balance', 'Job Satisfaction', 'Performance Rating',
-    'Education Level', 'Job Level', 'Company Size',
-    'Company Reputation', 'Employee Recognition'
-]
-encoder_categories = [
-    ['Poor', 'Fair', 'Good', 'Excellent'],
-    ['Low', 'Medium', 'High', 'Very High'],
-    ['Low', 'Below Average', 'Average', 'High'],
-    ["High School", "Bachelor’s Degree", "Master’s Degree", "Associate Degree", "PhD"],
-    ['Entry', 'Mid', 'Senior'],
-    ['Small', 'Medium', 'Large'],
-    ['Poor', 'Fair', 'Good', 'Excellent'],
-    ['Low', 'Medium', 'High', 'Very High'],
-]
+def risk_assessment(proba: float):
+    risk_level = "High" if proba >= 0.7 else "Medium" if proba >= 0.4 else "Low"
+    if risk_level == "High":
+        recommendation = "Schedule retention interview."
+    elif risk_level == "Medium":
+        recommendation = "Monitor employee engagement."
+    else:
+        recommendation = "No immediate action needed."
+    return risk_level, recommendation
 
-oe = OrdinalEncoder(categories=encoder_categories, handle_unknown='use_encoded_value', unknown_value=-1)
 
-# Fit encoder with dummy rows using all categories
-# Pad category lists to the same length
-max_len = max(len(cat) for cat in encoder_categories)
-padded_categories = [
-    cat + [cat[-1]] * (max_len - len(cat))  # Repeat last element to match max length
-    for cat in encoder_categories
-]
+async def get_employee_features_via_server(emp_ids: List[int]):
+    payload = {
+        "feature_service": FEATURE_SERVICE_NAME,
+        "entities": {
+            "employee_id": emp_ids
+        }
+    }
+    try:
+        response = await feast_client.post(f"{FEAST_SERVER_URL}/get-online-features", json=payload)
+        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+        body = response.json()
+        feature_names = body.get('metadata', {}).get('feature_names', [])
+        results = body.get('results', [])
+    except Exception as e:
+        print(f"Error communicating with Feast server: {e}")
+        return None
 
-# Now zip into rows
-dummy_rows = list(zip(*padded_categories))
-print('dummy rows: ', dummy_rows)
-dummy_data = pd.DataFrame.from_records(dummy_rows, columns=encoder_columns)
-print('dummy data: ', dummy_data)
-oe.fit(dummy_data)
+    # Filter out employee_id as it's an entity key, not a feature for the model
+    filtered_feature_names = [name for name in feature_names if name != 'employee_id']
+    print(f"Feature_name: {filtered_feature_names}")
+    feature_schema_cache.put(FEATURE_SERVICE_NAME, sorted(filtered_feature_names))
+
+    # results are aligned with feature_names, each holding one value per requested entity
+    for i, emp_id in enumerate(emp_ids):
+        features = {
+            name: result['values'][i]
+            for name, result in zip(feature_names, results)
+            if name != 'employee_id' and i < len(result.get('values', []))
+        }
+        online_feature_cache.put(emp_id, features)
+    return sorted(filtered_feature_names)
 
 
-def preprocess_input(data: dict):
-    df = pd.DataFrame([data])
-    
-    # Boolean mapping
-    bool_cols_map = {
-        'Overtime': {'No': 0, 'Yes': 1},
-        'Remote Work': {'No': 0, 'Yes': 1},
-        'Opportunities': {'No': 0, 'Yes': 1}
-    }
-    for col, mapping in bool_cols_map.items():
-        if col in df.columns:
-            df[col] = df[col].map(mapping).fillna(-1) # Fillna for robustness if category missing
-
-    # Map Monthly Income
-    def map_income(income):
-        income = float(income)
-        if 1200 <= income <= 10000: return 0
-        elif 10001 <= income <= 20000: return 1
-        elif 20001 <= income <= 35000: return 2
-        elif 35001 <= income <= 50000: return 3
-        elif income >= 50001: return 4
-        else: return -1
-
-    def age_mapping(age):
-        if age < 25:
-            return 0
-        elif 25 <= age < 35:
-            return 1
-        elif 35 <= age < 45:
-            return 2
-        elif 45 <= age < 55:
-            return 3
-        else:
-            return 4
+async def get_model_feature_order(emp_id: int):
+    feature_order = feature_schema_cache.get(FEATURE_SERVICE_NAME)
+    if feature_order is not None:
+        return feature_order
 
-    if 'Monthly Income' in df:
-        df['Monthly Income'] = df['Monthly Income'].apply(map_income)
+    feature_order = await get_employee_features_via_server([emp_id])
+    if feature_order is None:
+        # Feast unreachable: keep serving the last known ordering if there is one
+        return feature_schema_cache.get(FEATURE_SERVICE_NAME, allow_stale=True)
+    return feature_order
 
-    if 'Age' in df:
-        df['Age'] = df['Age'].apply(age_mapping)
 
-    # Apply Ordinal Encoding
-    for col in encoder_columns:
-        if col not in df.columns:
-            print(f"⚠️ Column '{col}' expected for ordinal encoding not found. Adding with default -1.")
-            df[col] = -1 # Add missing column with a default encoded value
-    df[encoder_columns] = oe.transform(df[encoder_columns]).astype('int')
-    print(f"df length: {len(df.columns)}")
+async def get_online_features(emp_ids: List[int]) -> Dict[int, dict]:
+    online_features = {}
+    missing = []
+    for emp_id in emp_ids:
+        cached = online_feature_cache.get(emp_id)
+        if cached is None:
+            missing.append(emp_id)
+        else:
+            online_features[emp_id] = cached
+
+    if missing:
+        await get_employee_features_via_server(missing)
+        for emp_id in missing:
+            cached = online_feature_cache.get(emp_id)
+            if cached is not None:
+                online_features[emp_id] = cached
+    return online_features
+
+
+async def backfill_online_features(df: "pd.DataFrame", records: List[dict], feature_order: List[str]) -> "pd.DataFrame":
+    # request fields always win, only features the request did not send come from the online store
+    needs = {}
+    for i, record in enumerate(records):
+        missing_columns = [col for col in feature_order if col not in record]
+        if missing_columns and record.get('employee_id') is not None:
+            needs[i] = missing_columns
+    if not needs:
+        return df
+
+    online_features = await get_online_features(list({records[i]['employee_id'] for i in needs}))
+    for i, missing_columns in needs.items():
+        features = online_features.get(records[i]['employee_id'])
+        if not features:
+            continue
+        for col in missing_columns:
+            if features.get(col) is None:
+                continue
+            if col not in df.columns:
+                df[col] = 0
+            df.at[df.index[i], col] = features[col]
     return df
 
 
-def get_employee_features_via_server(emp_id: int):
-    payload = {
-        "feature_service": "employee_attrition_features",
-        "entities": {
-            "employee_id": [emp_id]
-        }
-    }
-    headers = {"Content-Type": "application/json"}
-   
+async def post_to_kserve(url: str, breaker: CircuitBreaker, instances: List[dict]):
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit breaker for {url} is open")
     try:
-        response = requests.post(
-            f"{FEAST_SERVER_URL}/get-online-features",
-            data=json.dumps(payload),
-            headers=headers
-        )
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        feature_names = response.json().get('metadata', {}).get('feature_names', [])
-        # Filter out employee_id as it's an entity key, not a feature for the model
-        filtered_feature_names = [name for name in feature_names if name != 'employee_id']
-        print(f"Feature_name: {filtered_feature_names}")
-        return sorted(filtered_feature_names)
-    except Exception as e:
-        print(f"Error communicating with Feast server: {e}")
+        if KSERVE_PROTOCOL == "v2":
+            content, headers = encode_infer_request(instances)
+            response = await kserve_client.post(url, content=content, headers=headers)
+        else:
+            response = await kserve_client.post(url, json={"instances": instances})
+        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+    except httpx.HTTPStatusError as e:
+        # a 4xx is a bad request, not a sick predictor
+        if e.response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    except httpx.HTTPError:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # cancelled (a hedge won) or failed before anything reached the predictor, e.g. a
+        # non-numeric value for the v2 tensor: no verdict on its health, free the half-open trial
+        breaker.release()
+        raise
+    breaker.record_success()
+    if KSERVE_PROTOCOL == "v2":
+        return decode_infer_response(response.content, response.headers)
+    body = response.json()
+    # the version this predictor worker scored with, it may lag or lead the registry
+    return body["predictions"], body["prediction_proba"], body.get("model_version")
+
+
+async def score_instances(instances: List[dict]):
+    if embedded_model is not None:
+        return await embedded_model.score(instances)
+    attempts = [functools.partial(post_to_kserve, url, breaker, instances) for url, breaker in kserve_replicas]
+    return await hedged(attempts, KSERVE_HEDGE_AFTER_MS / 1000)
+
+
+kserve_batcher = MicroBatcher(score_instances, KSERVE_BATCH_MAX_SIZE, KSERVE_BATCH_WAIT_MS) if KSERVE_BATCHING_ENABLED else None
+
+
+def current_model_version() -> Optional[str]:
+    if embedded_model is not None:
+        return embedded_model.version
+    return registry_watcher.version if registry_watcher is not None else None
+
+
+def cached_result(instance: dict):
+    if result_cache is None:
         return None
+    result_cache.set_model_version(current_model_version())
+    return result_cache.get(instance)
+
+
+def cache_result(instance: dict, label, proba: float, model_version: Optional[str]):
+    if result_cache is not None:
+        result_cache.put(instance, label, proba, model_version)
+
+
+async def predict_instance(instance: dict):
+    cached = cached_result(instance)
+    if cached is not None:
+        return cached
+    if kserve_batcher is not None:
+        label, proba, model_version = await kserve_batcher.submit(instance)
+    else:
+        labels, probas, model_version = await score_instances([instance])
+        label, proba = labels[0], probas[0]
+    cache_result(instance, label, proba, model_version)
+    return label, proba
+
+
+async def predict_instances(instances: List[dict]):
+    # only rows without a cached result for the serving model version go to the model
+    results = [cached_result(instance) for instance in instances]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        labels, probas, model_version = await score_instances([instances[i] for i in missing])
+        if len(labels) != len(missing) or len(probas) != len(missing):
+            raise ValueError(f"Model returned {len(probas)} predictions for {len(missing)} rows.")
+        for i, label, proba in zip(missing, labels, probas):
+            results[i] = (label, proba)
+            cache_result(instances[i], label, proba, model_version)
+    return [label for label, _ in results], [proba for _, proba in results]
+
+
+async def backfill_instance(instance: dict, record: dict) -> dict:
+    # same rules as backfill_online_features, for a single already-ordered instance
+    missing_columns = [col for col in instance if col not in record]
+    employee_id = record.get('employee_id')
+    if missing_columns and employee_id is not None:
+        features = (await get_online_features([employee_id])).get(employee_id) or {}
+        for col in missing_columns:
+            if features.get(col) is not None:
+                instance[col] = features[col]
+    for col in missing_columns:
+        if instance[col] != instance[col]:  # still NaN, default like reindex(fill_value=0)
+            instance[col] = 0
+    return instance
 
 
 def log_metrics_service(data: dict):
+    # queued and shipped in batches by the background shipper, never blocks the request
+    metrics_shipper.submit(data)
+
+
+def log_employee_id(value) -> Optional[int]:
+    # employee_id is an int64 log column and a JSON response field: NaN (a record
+    # without one in a batch) and anything else that is not a number become None
     try:
-        response = requests.post(f"{MONITORING_URL}/log", json=data)
-        response.raise_for_status()
-        print("Metrics sent to monitoring service successfully!")
-    except requests.exceptions.RequestException as e:
-        print(f"Error sending metrics to monitoring service: {e}")
-
-def save_input_data(data: dict):
-    # save new data in csv file
-    if os.path.exists(INPUT_FILE_PATH):
-        existing_data = pd.read_csv(INPUT_FILE_PATH)
-        updated = pd.concat([existing_data, pd.DataFrame([data])], ignore_index=True)
-    else:
-        updated = pd.DataFrame([data])
-    updated.to_csv(INPUT_FILE_PATH, index=False)
-    print("New Data is saved !!!")
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
-def save_prediction_output(data: dict):
-    print(data)
-    prediction_df = pd.DataFrame([data])
-    
-    if os.path.exists(PREDICTION_OUTPUT_FILE):            
-        existing_data = pd.read_csv(PREDICTION_OUTPUT_FILE)
-        updated = pd.concat([existing_data, prediction_df], ignore_index=True)
-    else:
-        updated = prediction_df
-    updated.to_csv(PREDICTION_OUTPUT_FILE, index=False)
-    print("New Output Data is saved !!!")
+
+def save_input_data(records: List[dict]):
+    # rows are buffered and written as parquet segments by the log writer thread
+    input_log.append(records)
+
+
+def save_prediction_output(records: List[dict]):
+    prediction_log.append(records)
+
+
+class RegistryUpdate(BaseModel):
+    registry_version: Optional[str] = None
+
+
+class OnlineFeatureInvalidation(BaseModel):
+    employee_ids: Optional[List[int]] = None
 
 
 class FormData(BaseModel):
     data: Dict[str, Any]
 
 
+class BatchFormData(BaseModel):
+    records: List[Dict[str, Any]]
+
+
 @app.post("/predict")
 async def predict(payload: FormData):
     # for monitoring
     start_time = time.time()
+    timer = StageTimer()
     prediction_output = None
     status = "success"
         
@@ -196,39 +454,32 @@ async def predict(payload: FormData):
         print("✅ Prediciton service called ------")
         print(f"{payload}")
 
-        preprocessed_input_data = preprocess_input(payload.data)
-        print("✅Transformed Input: ", preprocessed_input_data.columns)
+        employee_id = payload.data.get('employee_id')
+        with timer.stage("feature_schema"):
+            FINAL_MODEL_FEATURE_ORDER = await get_model_feature_order(employee_id)
+        if FINAL_MODEL_FEATURE_ORDER is None:
+            status = "input_error"
+            print("Feast service did not find features")
+            return {"error": "Feast service did not find features."}
 
-        save_input_data(preprocessed_input_data.to_dict(orient="records")[0])  # Save the first record for simplicity
+        # single record fast path: dict lookups straight into the model feature order
+        with timer.stage("preprocess"):
+            final_input = dict(zip(FINAL_MODEL_FEATURE_ORDER, compiled_preprocessor.transform(payload.data, FINAL_MODEL_FEATURE_ORDER).tolist()))
+        with timer.stage("online_features"):
+            final_input = await backfill_instance(final_input, payload.data)
+        print("✅Transformed Input: ", final_input)
 
-        FINAL_MODEL_FEATURE_ORDER = get_employee_features_via_server(payload.data['employee_id'])
-        final_input = preprocessed_input_data.reindex(columns=FINAL_MODEL_FEATURE_ORDER, fill_value=0)
+        request_id = uuid.uuid4().hex
+        logged_at = datetime.now(timezone.utc)
+        with timer.stage("persistence"):
+            save_input_data([{"employee_id": log_employee_id(employee_id), **final_input, "request_id": request_id, "logged_at": logged_at}])
 
-        # validation: check for any NaNs introduced by reindexing
-        if final_input is None:
-            status = "input_error"
-            print(f"Feast service did not find features: {final_input}")
-            return {"error": f"Feast service did not find features: {final_input}."}
+        # Send to KServe, coalesced with concurrent requests when batching is enabled
+        with timer.stage("model"):
+            prediction_result, result = await predict_instance(final_input)
+        print('✅😷 result: ', prediction_result, result)
 
-        print(f"Final input DataFrame shape for KServe: {final_input.shape}")
-        # print(f"Final input DataFrame columns for KServe: {final_input.columns.tolist()}")
-
-        # Send to KServe model running locally
-        print(KSERVE_URL)
-        response = requests.post(KSERVE_URL, json={"instances": final_input.to_dict(orient="records")})
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        
-        print('✅😷 result: ', response.json())
-        prediction_result = response.json()["predictions"][0]
-
-        result = response.json()["prediction_proba"]
-        prediction_output = "High" if result >= 0.7 else "Medium" if result >= 0.4 else "Low"
-        if prediction_output == "High":
-            recommendation = "Schedule retention interview."
-        elif prediction_output == "Medium":
-            recommendation = "Monitor employee engagement."
-        else:
-            recommendation = "No immediate action needed."
+        prediction_output, recommendation = risk_assessment(result)
 
         payload = {
             "attrition_label": prediction_result,
@@ -236,11 +487,22 @@ async def predict(payload: FormData):
             "risk_level": prediction_output,
             "recommendation": recommendation
         }
-        save_prediction_output(payload)  # Save the prediction output
+        with timer.stage("persistence"):
+            save_prediction_output([{
+                **payload,
+                "employee_id": log_employee_id(employee_id),
+                "request_id": request_id,
+                "logged_at": logged_at
+            }])  # Save the prediction output
 
         return payload
     
-    except requests.exceptions.RequestException as e:
+    except CircuitOpenError as e:
+        status = "kserve_unavailable"
+        print(f"KServe unavailable: {e}")
+        raise HTTPException(status_code=503, detail=f"KServe unavailable: {e}")
+
+    except httpx.HTTPError as e:
         status = "kserve_error"
         print(f"Error communicating with KServe: {e}")
         raise HTTPException(status_code=500, detail=f"Error from KServe: {e}. Check KServe logs for details.")
@@ -252,12 +514,138 @@ async def predict(payload: FormData):
     finally:
         end_time = time.time()
         latency = (end_time - start_time) * 1000
-        log_metrics_service({
-            "latency_ms": latency,
-            "status": status,
-            "prediction": prediction_output,
-        })
+        stages_ms = {name: round(value, 3) for name, value in timer.stages_ms.items()}
+        with timer.stage("monitoring"):
+            log_metrics_service({
+                "latency_ms": latency,
+                "status": status,
+                "prediction": prediction_output,
+                "stages_ms": stages_ms,
+            })
+        stage_latencies["predict"].record({**timer.stages_ms, "total": latency})
+
+
+@app.post("/predict/batch")
+async def predict_batch(payload: BatchFormData):
+    # for monitoring
+    start_time = time.time()
+    timer = StageTimer()
+    status = "success"
+
+    try:
+        if not payload.records:
+            status = "input_error"
+            return {"error": "No records provided."}
+
+        with timer.stage("preprocess"):
+            preprocessed = preprocess_records(payload.records)
+        # feature order only depends on the feature service, one lookup serves the whole batch
+        with timer.stage("feature_schema"):
+            feature_order = await get_model_feature_order(payload.records[0].get('employee_id'))
+        if feature_order is None:
+            status = "input_error"
+            return {"error": "Feast service did not return the model feature order."}
+        with timer.stage("online_features"):
+            preprocessed = await backfill_online_features(preprocessed, payload.records, feature_order)
+        with timer.stage("preprocess"):
+            final_input = preprocessed.reindex(columns=feature_order, fill_value=0).to_dict(orient="records")
+
+        # the model input, like /predict logs it
+        employee_ids = [log_employee_id(value) for value in preprocessed['employee_id']] if 'employee_id' in preprocessed else [None] * len(preprocessed)
+        request_ids = [uuid.uuid4().hex for _ in range(len(final_input))]
+        logged_at = datetime.now(timezone.utc)
+        with timer.stage("persistence"):
+            save_input_data([
+                {"employee_id": employee_id, **row, "request_id": request_id, "logged_at": logged_at}
+                for employee_id, row, request_id in zip(employee_ids, final_input, request_ids)
+            ])
+
+        with timer.stage("model"):
+            try:
+                labels, probas = await predict_instances(final_input)
+            except ValueError as e:
+                status = "kserve_error"
+                raise HTTPException(status_code=502, detail=str(e))
+
+        results = []
+        for employee_id, label, proba in zip(employee_ids, labels, probas):
+            risk_level, recommendation = risk_assessment(proba)
+            results.append({
+                "employee_id": employee_id,
+                "attrition_label": label,
+                "prediction": round(proba, 3),
+                "risk_level": risk_level,
+                "recommendation": recommendation
+            })
+        with timer.stage("persistence"):
+            save_prediction_output([
+                {**result, "request_id": request_id, "logged_at": logged_at}
+                for result, request_id in zip(results, request_ids)
+            ])
+
+        return {"predictions": results}
+
+    except CircuitOpenError as e:
+        status = "kserve_unavailable"
+        print(f"KServe unavailable: {e}")
+        raise HTTPException(status_code=503, detail=f"KServe unavailable: {e}")
+
+    except httpx.HTTPError as e:
+        status = "kserve_error"
+        print(f"Error communicating with KServe: {e}")
+        raise HTTPException(status_code=500, detail=f"Error from KServe: {e}. Check KServe logs for details.")
 
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        status = "internal_error"
+        return {"error": str(e)}
+
+    finally:
+        latency = (time.time() - start_time) * 1000
+        stages_ms = {name: round(value, 3) for name, value in timer.stages_ms.items()}
+        with timer.stage("monitoring"):
+            log_metrics_service({
+                "latency_ms": latency,
+                "status": status,
+                "prediction": f"batch:{len(payload.records)}",
+                "stages_ms": stages_ms,
+            })
+        stage_latencies["predict_batch"].record({**timer.stages_ms, "total": latency})
+
+@app.post("/admin/feature-schema/invalidate")
+async def invalidate_feature_schema(update: RegistryUpdate):
+    # called after `feast apply`; without a version the cache is always dropped
+    if update.registry_version is None:
+        feature_schema_cache.invalidate()
+        invalidated = True
+    else:
+        invalidated = feature_schema_cache.set_registry_version(update.registry_version)
+    return {"invalidated": invalidated, "registry_version": feature_schema_cache.registry_version}
+
+
+@app.post("/admin/online-features/invalidate")
+async def invalidate_online_features(invalidation: OnlineFeatureInvalidation):
+    # called after `materialize_incremental`; without ids every cached vector is dropped
+    removed = online_feature_cache.invalidate(invalidation.employee_ids)
+    return {"invalidated": removed}
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "feature_schema_cache": feature_schema_cache.stats(),
+        "online_feature_cache": online_feature_cache.stats(),
+        "metrics_shipper": metrics_shipper.stats(),
+        "input_log": input_log.stats(),
+        "prediction_log": prediction_log.stats(),
+        "model": {"mode": MODEL_MODE, "version": current_model_version(), **(embedded_model.stats() if embedded_model is not None else {})},
+        "kserve_batcher": kserve_batcher.stats() if kserve_batcher is not None else None,
+        "result_cache": result_cache.stats() if result_cache is not None else None,
+        "kserve_circuit_breakers": {url: breaker.stats() for url, breaker in kserve_replicas},
+        "stages_ms": {endpoint: histograms.snapshot() for endpoint, histograms in stage_latencies.items()},
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from stats import Histogram
+
+ScoreFn = Callable[[List[dict]], Awaitable[Tuple[list, list, Optional[str]]]]
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+QUEUE_DELAY_BUCKETS_MS = [0.1, 0.5, 1, 2, 5, 10, 25, 50, 100]
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one model call.
+
+    Rows submitted while other requests are in flight are gathered for up to
+    `max_wait_ms` (or until `max_batch_size` rows are queued) and scored with a single
+    `score_fn` call; each caller gets its own (label, probability, model version) back. When the
+    service is idle a row is dispatched straight away, so batching only adds delay
+    when there is something to batch with.
+    """
+
+    def __init__(self, score_fn: ScoreFn, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_delay_ms = Histogram(QUEUE_DELAY_BUCKETS_MS)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        # the event loop only keeps weak references to tasks, hold the dispatches until they finish
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # let batches already handed to the model answer their callers
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def submit(self, instance: dict):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait((instance, future, loop.time()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            self._take_queued(batch)
+
+            # only wait for more rows when other requests are already being scored
+            if self._in_flight and len(batch) < self.max_batch_size:
+                deadline = loop.time() + self.max_wait_s
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                    self._take_queued(batch)
+
+            dispatched_at = loop.time()
+            for _, _, queued_at in batch:
+                self.queue_delay_ms.observe((dispatched_at - queued_at) * 1000)
+            self.batch_sizes.observe(len(batch))
+            # counted before the task first runs, so the next batch already sees it in flight
+            self._in_flight += 1
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    def _take_queued(self, batch: list):
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _dispatch(self, batch: list):
+        try:
+            labels, probas, model_version = await self.score_fn([instance for instance, _, _ in batch])
+            if len(labels) != len(batch) or len(probas) != len(batch):
+                raise ValueError(f"Model returned {len(probas)} predictions for {len(batch)} rows.")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), label, proba in zip(batch, labels, probas):
+                if not future.done():
+                    future.set_result((label, proba, model_version))
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "in_flight_batches": self._in_flight,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_delay_ms": self.queue_delay_ms.snapshot(),
+        }
@@ -0,0 +1,277 @@
+"""Open-loop load test of the prediction service against local dependency stubs.
+
+Starts `stubs.py` and the prediction service (`app.py`) as uvicorn subprocesses,
+sends /predict (or /predict/batch) requests at a fixed rate and reports p50/p95/p99
+latency, throughput and errors. Requests are scheduled independently of responses,
+and latency is measured from the scheduled send time, so a slow service shows up as
+latency instead of silently lowering the offered load.
+
+Each run is appended to benchmark/results.jsonl together with the git commit and the
+run configuration; `--compare` prints the change against the previous run with the
+same configuration.
+
+    python load_test.py --qps 200 --duration 30
+    python load_test.py --qps 200 --kserve-latency-ms 20 --kserve-error-rate 0.01 --compare
+    python load_test.py --endpoint batch --batch-size 50 --qps 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, "results.jsonl")
+TEST_DATA = os.path.join(SERVICE_DIR, "..", "raw_data", "test.csv")
+
+# the fields the frontend form sends to /predict
+REQUEST_FIELDS = [
+    "Age", "Years at Company", "Monthly Income", "Work-Life Balance", "Job Satisfaction",
+    "Performance Rating", "Number of Promotions", "Overtime", "Education Level",
+    "Number of Dependents", "Job Level", "Company Size", "Company Tenure", "Remote Work",
+    "Company Reputation", "Employee Recognition", "Opportunities",
+]
+
+
+def load_records(limit: int) -> List[dict]:
+    df = pd.read_csv(TEST_DATA, nrows=limit)
+    opportunities = (df["Leadership Opportunities"] == "Yes") | (df["Innovation Opportunities"] == "Yes")
+    df["Opportunities"] = np.where(opportunities, "Yes", "No")
+    df["employee_id"] = df["Employee ID"]
+    return df[REQUEST_FIELDS + ["employee_id"]].to_dict(orient="records")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(module: str, cwd: str, port: int, env: dict, log_file) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd,
+        env={**os.environ, **env},
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout_s: float = 60):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout_s}s")
+
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def drive(url: str, payloads: List[dict], qps: float, duration_s: float, warmup_s: float, max_connections: int):
+    """Send requests at `qps` for warmup + duration seconds; returns post-warmup samples."""
+    samples = []  # (latency_ms, ok)
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        total = int((warmup_s + duration_s) * qps)
+
+        async def one(i: int, scheduled: float):
+            try:
+                response = await client.post(url, json=payloads[i % len(payloads)])
+                ok = response.status_code == 200 and "error" not in response.json()
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            if scheduled - start >= warmup_s:
+                samples.append(((loop.time() - scheduled) * 1000, ok))
+
+        tasks = []
+        for i in range(total):
+            scheduled = start + i / qps
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start - warmup_s
+    return samples, elapsed
+
+
+def summarize(samples, elapsed_s: float, rows_per_request: int) -> dict:
+    latencies = np.array([latency for latency, _ in samples])
+    ok = sum(1 for _, success in samples if success)
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - ok,
+        "error_rate": round((len(samples) - ok) / len(samples), 4) if samples else None,
+        "throughput_rps": round(ok / elapsed_s, 2) if elapsed_s > 0 else None,
+        "throughput_rows_s": round(ok * rows_per_request / elapsed_s, 2) if elapsed_s > 0 else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+        "max_ms": round(float(latencies.max()), 2) if len(latencies) else None,
+    }
+
+
+def previous_result(config: dict) -> Optional[dict]:
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    previous = None
+    with open(RESULTS_FILE) as file:
+        for line in file:
+            entry = json.loads(line)
+            if entry.get("config") == config:
+                previous = entry
+    return previous
+
+
+def print_report(result: dict, previous: Optional[dict]):
+    summary = result["summary"]
+    rate = f" @ {result['config']['qps']} qps" if result["config"].get("qps") is not None else ""
+    print(f"\ncommit {result['commit']}  {result['config']['endpoint']}{rate}")
+    for key, value in summary.items():
+        line = f"  {key:<18} {value}"
+        if previous is not None and isinstance(value, (int, float)) and isinstance(previous["summary"].get(key), (int, float)):
+            before = previous["summary"][key]
+            if before:
+                line += f"   ({(value - before) / before:+.1%} vs {previous['commit']})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=["single", "batch"], default="single")
+    parser.add_argument("--batch-size", type=int, default=50, help="records per /predict/batch request")
+    parser.add_argument("--qps", type=float, default=100, help="requests per second offered")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds sent before measuring")
+    parser.add_argument("--records", type=int, default=2000, help="distinct request records taken from raw_data/test.csv")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    for dependency in ("feast", "kserve", "monitoring"):
+        parser.add_argument(f"--{dependency}-latency-ms", type=float, default=0, help=f"mean injected {dependency} latency")
+        parser.add_argument(f"--{dependency}-error-rate", type=float, default=0, help=f"fraction of {dependency} calls failing")
+    parser.add_argument("--kserve-protocol", choices=["v1", "v2"], default="v1", help="v2 sends binary tensors")
+    parser.add_argument("--kserve-hedge-after-ms", type=float, default=None, help="hedge slow KServe calls to a second (stub) replica")
+    parser.add_argument("--service-env", action="append", default=[], metavar="KEY=VALUE", help="extra prediction service environment")
+    parser.add_argument("--compare", action="store_true", help="compare against the previous run with the same configuration")
+    parser.add_argument("--no-save", action="store_true", help="do not append the run to results.jsonl")
+    args = parser.parse_args()
+
+    records = load_records(args.records)
+    random.Random(args.seed).shuffle(records)
+    if args.endpoint == "single":
+        payloads = [{"data": record} for record in records]
+        rows_per_request = 1
+    else:
+        payloads = [{"records": records[i:i + args.batch_size]} for i in range(0, len(records), args.batch_size)]
+        rows_per_request = args.batch_size
+
+    config = {
+        "endpoint": args.endpoint,
+        "batch_size": rows_per_request,
+        "qps": args.qps,
+        "duration_s": args.duration,
+        "records": args.records,
+        "stubs": {
+            dependency: {
+                "latency_ms": getattr(args, f"{dependency}_latency_ms"),
+                "error_rate": getattr(args, f"{dependency}_error_rate"),
+            }
+            for dependency in ("feast", "kserve", "monitoring")
+        },
+        "kserve_protocol": args.kserve_protocol,
+        "kserve_hedge_after_ms": args.kserve_hedge_after_ms,
+        "service_env": sorted(args.service_env),
+    }
+
+    stub_port, service_port = free_port(), free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stub_env = {}
+    for dependency, values in config["stubs"].items():
+        stub_env[f"STUB_{dependency.upper()}_LATENCY_MS"] = str(values["latency_ms"])
+        stub_env[f"STUB_{dependency.upper()}_ERROR_RATE"] = str(values["error_rate"])
+    service_env = {
+        "FEAST_SERVER_URL": stub_url,
+        "KSERVE_URL": f"{stub_url}/v1/models/mlops_employee_attrition:predict",
+        "MONITORING_URL": stub_url,
+        "MLFLOW_TRACKING_URI": stub_url,
+        "PYTHONPATH": SERVICE_DIR,
+    }
+    if args.kserve_protocol == "v2":
+        service_env["KSERVE_PROTOCOL"] = "v2"
+        service_env["KSERVE_URL"] = f"{stub_url}/v2/models/mlops_employee_attrition/infer"
+    if args.kserve_hedge_after_ms is not None:
+        replica = "v2/models/mlops_employee_attrition-replica/infer" if args.kserve_protocol == "v2" else "v1/models/mlops_employee_attrition-replica:predict"
+        service_env["KSERVE_HEDGE_URL"] = f"{stub_url}/{replica}"
+        service_env["KSERVE_HEDGE_AFTER_MS"] = str(args.kserve_hedge_after_ms)
+    service_env.update(entry.split("=", 1) for entry in args.service_env)
+
+    with tempfile.TemporaryDirectory() as work_dir, open(os.path.join(work_dir, "servers.log"), "w+") as log_file:
+        stubs = start_server("stubs:app", BENCHMARK_DIR, stub_port, stub_env, log_file)
+        # run from a scratch directory so request/prediction logs do not land in the repo
+        service = start_server("app:app", work_dir, service_port, service_env, log_file)
+        try:
+            wait_until_up(f"{stub_url}/stub/stats", stubs)
+            wait_until_up(f"http://127.0.0.1:{service_port}/stats", service)
+            path = "/predict" if args.endpoint == "single" else "/predict/batch"
+            samples, elapsed = asyncio.run(drive(
+                f"http://127.0.0.1:{service_port}{path}", payloads, args.qps, args.duration, args.warmup, args.max_connections,
+            ))
+            service_stats = httpx.get(f"http://127.0.0.1:{service_port}/stats", timeout=5).json()
+            stub_stats = httpx.get(f"{stub_url}/stub/stats", timeout=5).json()
+        except Exception:
+            log_file.seek(0)
+            print(log_file.read()[-5000:])
+            raise
+        finally:
+            stop(service)
+            stop(stubs)
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": config,
+        "summary": summarize(samples, elapsed, rows_per_request),
+        "dependency_calls": stub_stats["calls"],
+        "service_stats": service_stats,
+    }
+    print_report(result, previous_result(config) if args.compare else None)
+    if not args.no_save:
+        with open(RESULTS_FILE, "a") as file:
+            file.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
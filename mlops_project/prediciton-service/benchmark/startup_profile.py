@@ -0,0 +1,127 @@
+"""Cold start profile of the prediction service.
+
+Reports two numbers:
+- the import-time breakdown of `app` (from `python -X importtime`), grouped by
+  top-level package, and
+- time to first successful prediction: from spawning a fresh uvicorn process until
+  the first /predict against the local stubs answers with a prediction.
+
+Runs are appended to benchmark/results.jsonl next to the load test results, so cold
+start is tracked per commit as well.
+
+    python startup_profile.py --runs 3 --compare
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from load_test import (
+    BENCHMARK_DIR, RESULTS_FILE, SERVICE_DIR, free_port, git_commit, load_records,
+    previous_result, print_report, start_server, stop, wait_until_up,
+)
+
+
+def import_profile(top: int = 15) -> dict:
+    """Cumulative import time (ms) of `app` and of each top-level package it pulls in."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=SERVICE_DIR, capture_output=True, text=True, check=True,
+    ).stderr
+    by_package = defaultdict(float)
+    total_ms = 0.0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        module = name.rstrip()
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        module = module.strip()
+        if module == "app":
+            total_ms = int(cumulative) / 1000
+        elif depth == 1:
+            # direct imports of app: their cumulative time includes everything below them
+            by_package[module.split(".")[0]] += int(cumulative) / 1000
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"total_ms": round(total_ms, 1), "by_package_ms": {name: round(ms, 1) for name, ms in ranked}}
+
+
+def time_to_first_prediction(payload: dict, timeout_s: float = 60) -> float:
+    stub_port, service_port = free_port(), free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    service_env = {
+        "FEAST_SERVER_URL": stub_url,
+        "KSERVE_URL": f"{stub_url}/v1/models/mlops_employee_attrition:predict",
+        "MONITORING_URL": stub_url,
+        "MLFLOW_TRACKING_URI": stub_url,
+        "PYTHONPATH": SERVICE_DIR,
+    }
+    with tempfile.TemporaryDirectory() as work_dir, open(os.path.join(work_dir, "servers.log"), "w+") as log_file:
+        stubs = start_server("stubs:app", BENCHMARK_DIR, stub_port, {}, log_file)
+        service = None
+        try:
+            wait_until_up(f"{stub_url}/stub/stats", stubs)
+            started = time.monotonic()
+            service = start_server("app:app", work_dir, service_port, service_env, log_file)
+            # one client for all polls, so the measurement does not include per-poll client setup
+            with httpx.Client(timeout=5) as client:
+                while time.monotonic() - started < timeout_s:
+                    if service.poll() is not None:
+                        log_file.seek(0)
+                        raise RuntimeError(f"prediction service exited:\n{log_file.read()[-5000:]}")
+                    try:
+                        response = client.post(f"http://127.0.0.1:{service_port}/predict", json=payload)
+                        if response.status_code == 200 and "prediction" in response.json():
+                            return (time.monotonic() - started) * 1000
+                    except httpx.HTTPError:
+                        pass
+                    time.sleep(0.01)
+            raise RuntimeError(f"no successful prediction within {timeout_s}s")
+        finally:
+            if service is not None:
+                stop(service)
+            stop(stubs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to measure, the median is reported")
+    parser.add_argument("--compare", action="store_true", help="compare against the previous cold start run")
+    parser.add_argument("--no-save", action="store_true", help="do not append the run to results.jsonl")
+    args = parser.parse_args()
+
+    payload = {"data": load_records(1)[0]}
+    imports = [import_profile() for _ in range(args.runs)]
+    first_predictions = sorted(time_to_first_prediction(payload) for _ in range(args.runs))
+    import_totals = sorted(profile["total_ms"] for profile in imports)
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {"endpoint": "cold_start", "qps": None, "runs": args.runs},
+        "summary": {
+            "import_app_ms": import_totals[len(import_totals) // 2],
+            "time_to_first_prediction_ms": round(first_predictions[len(first_predictions) // 2], 1),
+        },
+        "import_breakdown_ms": imports[-1]["by_package_ms"],
+    }
+    print("import time by package (ms):")
+    for name, ms in result["import_breakdown_ms"].items():
+        print(f"  {name:<20} {ms}")
+    print_report(result, previous_result(result["config"]) if args.compare else None)
+    if not args.no_save:
+        with open(RESULTS_FILE, "a") as file:
+            file.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
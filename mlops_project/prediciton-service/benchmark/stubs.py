@@ -0,0 +1,159 @@
+"""Local stand-ins for the services the prediction service depends on.
+
+One FastAPI app serves the Feast `/get-online-features` endpoint, the KServe
+`:predict` endpoint, the monitoring `/log` and `/log/batch` endpoints and the MLflow
+registry `get-latest-versions` call, so the prediction path can be load tested
+without a cluster. Latency and error injection are configured per dependency:
+
+    STUB_FEAST_LATENCY_MS, STUB_FEAST_ERROR_RATE
+    STUB_KSERVE_LATENCY_MS, STUB_KSERVE_ERROR_RATE
+    STUB_MONITORING_LATENCY_MS, STUB_MONITORING_ERROR_RATE
+
+Latencies are the mean of an exponential delay (0 disables it), error rates the
+fraction of calls answered with a 503.
+
+    STUB_PORT=8100 python stubs.py
+"""
+import asyncio
+import json
+import os
+import random
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel
+
+# features served by the employee_attrition_features feature service
+FEATURE_NAMES = [
+    "employee_id", "Age", "Company Reputation", "Company Size", "Company Tenure",
+    "Education Level", "Employee Recognition", "Job Level", "Job Satisfaction",
+    "Monthly Income", "Number of Dependents", "Number of Promotions", "Opportunities",
+    "Overtime", "Performance Rating", "Remote Work", "Work-Life Balance", "Years at Company",
+]
+MODEL_VERSION = os.environ.get("STUB_MODEL_VERSION", "1")
+
+
+def _config(dependency: str) -> Dict[str, float]:
+    return {
+        "latency_ms": float(os.environ.get(f"STUB_{dependency}_LATENCY_MS", "0")),
+        "error_rate": float(os.environ.get(f"STUB_{dependency}_ERROR_RATE", "0")),
+    }
+
+
+CONFIG = {dependency: _config(dependency) for dependency in ("FEAST", "KSERVE", "MONITORING")}
+CALLS = {dependency: 0 for dependency in CONFIG}
+ERRORS = {dependency: 0 for dependency in CONFIG}
+
+app = FastAPI()
+
+
+async def simulate(dependency: str):
+    config = CONFIG[dependency]
+    CALLS[dependency] += 1
+    if config["latency_ms"] > 0:
+        await asyncio.sleep(random.expovariate(1000 / config["latency_ms"]))
+    if random.random() < config["error_rate"]:
+        ERRORS[dependency] += 1
+        raise HTTPException(status_code=503, detail=f"Injected {dependency.lower()} error")
+
+
+def _feature_value(name: str, employee_id: int):
+    # stable per employee, within the ranges the preprocessing produces
+    rng = random.Random(zlib.crc32(f"{employee_id}:{name}".encode()))
+    return rng.randint(0, 4)
+
+
+class OnlineFeatureRequest(BaseModel):
+    feature_service: str
+    entities: Dict[str, List[Any]]
+
+
+@app.post("/get-online-features")
+async def get_online_features(request: OnlineFeatureRequest):
+    await simulate("FEAST")
+    employee_ids = request.entities.get("employee_id", [])
+    results = []
+    for name in FEATURE_NAMES:
+        if name == "employee_id":
+            values = list(employee_ids)
+        else:
+            values = [_feature_value(name, employee_id) for employee_id in employee_ids]
+        results.append({"values": values, "statuses": ["PRESENT"] * len(values)})
+    return {"metadata": {"feature_names": FEATURE_NAMES}, "results": results}
+
+
+class PredictRequest(BaseModel):
+    instances: List[Dict[str, Any]]
+
+
+@app.post("/v1/models/{model_name}:predict")
+async def predict(model_name: str, request: PredictRequest):
+    await simulate("KSERVE")
+    probas = []
+    for instance in request.instances:
+        # deterministic per input row, like a real model
+        seed = zlib.crc32(repr(sorted(instance.items())).encode())
+        probas.append(round(random.Random(seed).random(), 4))
+    return {"predictions": [int(p >= 0.5) for p in probas], "prediction_proba": probas, "model_version": MODEL_VERSION}
+
+
+@app.post("/v2/models/{model_name}/infer")
+async def infer(model_name: str, request: Request):
+    # Open Inference Protocol with the binary tensor extension, as sent with KSERVE_PROTOCOL=v2
+    await simulate("KSERVE")
+    content = await request.body()
+    header_length = int(request.headers.get("Inference-Header-Content-Length", len(content)))
+    body = json.loads(content[:header_length])
+    tensor = body["inputs"][0]
+    if "parameters" in tensor and "binary_data_size" in tensor["parameters"]:
+        features = np.frombuffer(content[header_length:], dtype="<f8").reshape(tensor["shape"])
+    else:
+        features = np.asarray(tensor["data"], dtype="<f8").reshape(tensor["shape"])
+    names = json.loads(body.get("parameters", {}).get("feature_names", "null")) or [str(i) for i in range(features.shape[1])]
+    probas = np.array([
+        round(random.Random(zlib.crc32(repr(sorted(zip(names, row.tolist()))).encode())).random(), 4)
+        for row in features
+    ])
+    outputs = [("predictions", (probas >= 0.5).astype("<i8"), "INT64"), ("prediction_proba", probas.astype("<f8"), "FP64")]
+    header = json.dumps({
+        "model_name": model_name,
+        "model_version": MODEL_VERSION,
+        "outputs": [
+            {"name": name, "shape": [len(data)], "datatype": datatype, "parameters": {"binary_data_size": data.nbytes}}
+            for name, data, datatype in outputs
+        ],
+    }).encode()
+    return Response(
+        header + b"".join(data.tobytes() for _, data, _ in outputs),
+        media_type="application/octet-stream",
+        headers={"Inference-Header-Content-Length": str(len(header))},
+    )
+
+
+@app.post("/log")
+async def log(data: Dict[str, Any]):
+    await simulate("MONITORING")
+    return {"message": "Log recorded successfully"}
+
+
+@app.post("/log/batch")
+async def log_batch(data: List[Dict[str, Any]]):
+    await simulate("MONITORING")
+    return {"message": "Logs recorded successfully", "count": len(data)}
+
+
+@app.post("/api/2.0/mlflow/registered-models/get-latest-versions")
+async def get_latest_versions(request: Dict[str, Any]):
+    return {"model_versions": [{"name": request.get("name"), "version": MODEL_VERSION, "current_stage": "Production"}]}
+
+
+@app.get("/stub/stats")
+async def stats():
+    return {"config": CONFIG, "calls": CALLS, "errors": ERRORS}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ.get("STUB_PORT", "8100")), log_level="warning")
@@ -0,0 +1,161 @@
+"""Offline bulk scoring of employee extracts with the registered MLflow model.
+
+Reads a CSV or Parquet extract in fixed-size chunks, runs every chunk through the
+same preprocessing as the prediction service and scores it in a process pool. Each
+chunk is written as its own Parquet part named after its first row, so memory stays
+bounded by the number of chunks in flight and an interrupted run can be resumed.
+
+    python bulk_score.py extract.csv scores/ --workers 8
+    python bulk_score.py extract.parquet scores/ --resume
+    python bulk_score.py extract.csv scores/ --offset 2000000
+
+The output directory reads as one table with `pd.read_parquet("scores")`.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from prediction_log import _write_parquet_atomic
+from preprocessing import preprocess_records
+
+MODEL_NAME = "Employee Attrition Model"
+MANIFEST = "_bulk_score.json"
+
+# set once per worker process by _init_worker
+_model = None
+_feature_order = None
+_model_version = None
+_threshold = 0.5
+
+
+def resolve_model_uri(model_uri: str, tracking_uri: str) -> Tuple[str, Optional[str]]:
+    """Pin a stage URI (models:/name/Production) to a version so every worker scores with the same model."""
+    import mlflow
+    from mlflow.tracking import MlflowClient
+
+    mlflow.set_tracking_uri(tracking_uri)
+    parts = model_uri.split("/")
+    if model_uri.startswith("models:/") and len(parts) == 3 and not parts[2].isdigit():
+        versions = MlflowClient().get_latest_versions(parts[1], stages=[parts[2]])
+        if not versions:
+            raise SystemExit(f"No '{parts[1]}' version in stage {parts[2]}")
+        return f"models:/{parts[1]}/{versions[0].version}", versions[0].version
+    return model_uri, parts[2] if model_uri.startswith("models:/") and len(parts) == 3 else None
+
+
+def _init_worker(model_uri: str, tracking_uri: str, model_version: Optional[str], threshold: float):
+    import mlflow
+
+    global _model, _feature_order, _model_version, _threshold
+    mlflow.set_tracking_uri(tracking_uri)
+    _model = mlflow.sklearn.load_model(model_uri)
+    _feature_order = list(getattr(_model, "feature_names_in_", []))
+    _model_version = model_version
+    _threshold = threshold
+
+
+def normalize_extract(chunk: pd.DataFrame) -> pd.DataFrame:
+    # HR extracts use the raw dataset column names, the service expects the form fields
+    chunk = chunk.rename(columns={"Employee ID": "employee_id"})
+    if "Opportunities" not in chunk and {"Leadership Opportunities", "Innovation Opportunities"} <= set(chunk.columns):
+        any_opportunity = (chunk["Leadership Opportunities"] == "Yes") | (chunk["Innovation Opportunities"] == "Yes")
+        chunk["Opportunities"] = np.where(any_opportunity, "Yes", "No")
+    return chunk
+
+
+def score_chunk(chunk: pd.DataFrame, out_dir: str, offset: int) -> int:
+    preprocessed = preprocess_records(normalize_extract(chunk).to_dict(orient="records"))
+    feature_order = _feature_order or sorted(col for col in preprocessed.columns if col != "employee_id")
+    features = preprocessed.reindex(columns=feature_order, fill_value=0)
+
+    probas = _model.predict_proba(features)[:, 1]
+    negative, positive = _model.classes_
+    result = pd.DataFrame({
+        "employee_id": preprocessed["employee_id"] if "employee_id" in preprocessed else np.arange(offset, offset + len(chunk)),
+        "attrition_label": np.where(probas >= _threshold, positive, negative),
+        "prediction": probas,
+        "model_version": _model_version,
+    })
+    _write_parquet_atomic(result, out_dir, part_name(offset))
+    return len(result)
+
+
+def part_name(offset: int) -> str:
+    return f"part-{offset:012d}.parquet"
+
+
+def read_chunks(path: str, chunk_size: int, offset: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Yield (first row, chunk) from `offset` on, with chunk boundaries at multiples of `chunk_size`."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        position = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            if position + batch.num_rows > offset:
+                yield position, batch.to_pandas()
+            position += batch.num_rows
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size, skiprows=range(1, offset + 1))
+        for i, chunk in enumerate(reader):
+            yield offset + i * chunk_size, chunk
+
+
+def load_manifest(out_dir: str, settings: dict, resume: bool):
+    path = os.path.join(out_dir, MANIFEST)
+    if resume and os.path.exists(path):
+        with open(path) as file:
+            previous = json.load(file)
+        if previous != settings:
+            raise SystemExit(f"Cannot resume: {path} was written with {previous}, this run uses {settings}")
+    with open(path, "w") as file:
+        json.dump(settings, file, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or Parquet extract")
+    parser.add_argument("out_dir", help="directory for the Parquet parts")
+    parser.add_argument("--model-uri", default=f"models:/{MODEL_NAME}/Production")
+    parser.add_argument("--tracking-uri", default=os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("PREDICTION_THRESHOLD", "0.5")))
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--offset", type=int, default=0, help="first input row to score (a multiple of --chunk-size)")
+    parser.add_argument("--resume", action="store_true", help="skip chunks whose part already exists in out_dir")
+    args = parser.parse_args()
+
+    if args.offset % args.chunk_size:
+        raise SystemExit("--offset must be a multiple of --chunk-size so parts line up with earlier runs")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    model_uri, model_version = resolve_model_uri(args.model_uri, args.tracking_uri)
+    load_manifest(args.out_dir, {"input": os.path.abspath(args.input), "chunk_size": args.chunk_size, "model_uri": model_uri, "threshold": args.threshold}, args.resume)
+    print(f"Scoring {args.input} with {model_uri} on {args.workers} workers")
+
+    started = time.time()
+    rows = skipped = 0
+    max_in_flight = args.workers * 2  # bounds how many chunks are held in memory
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(model_uri, args.tracking_uri, model_version, args.threshold)) as pool:
+        in_flight = set()
+        for offset, chunk in read_chunks(args.input, args.chunk_size, args.offset):
+            if args.resume and os.path.exists(os.path.join(args.out_dir, part_name(offset))):
+                skipped += 1
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                rows += sum(future.result() for future in done)
+                print(f"{rows} rows scored, {rows / (time.time() - started):.0f} rows/s")
+            in_flight.add(pool.submit(score_chunk, chunk, args.out_dir, offset))
+        rows += sum(future.result() for future in wait(in_flight).done)
+
+    print(f"Scored {rows} rows in {time.time() - started:.1f}s ({skipped} chunks already done) into {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
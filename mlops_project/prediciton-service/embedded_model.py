@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+class EmbeddedModel:
+    """Production model from the MLflow registry, scored inside the prediction service.
+
+    A watcher thread polls the registry for a new version in `stage`; the new model is
+    loaded next to the current one and swapped in with a single assignment, so
+    requests already scoring keep the model they started with.
+    """
+
+    def __init__(self, model_name: str, stage: str, tracking_uri: str, poll_interval_s: float = 60, threshold: float = 0.5):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.stage = stage
+        self.tracking_uri = tracking_uri
+        self.poll_interval_s = poll_interval_s
+        self.reloads = 0
+        self._current = (None, None)  # (version, model), replaced as a whole
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._current[0]
+
+    def load_latest(self) -> bool:
+        """Load the current registry version if it differs from the one being served."""
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        versions = MlflowClient().get_latest_versions(self.model_name, stages=[self.stage])
+        if not versions:
+            print(f"No '{self.model_name}' version in stage {self.stage}")
+            return False
+
+        latest = versions[0].version
+        if latest == self.version:
+            return False
+
+        model = mlflow.sklearn.load_model(f"models:/{self.model_name}/{latest}")
+        self._current = (latest, model)
+        self.reloads += 1
+        print(f"Serving '{self.model_name}' version {latest} in-process")
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="embedded-model-watcher", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.load_latest()
+            except Exception as e:
+                # keep serving the current version until the registry is reachable again
+                print(f"Error checking registry for a new model version: {e}")
+
+    def predict(self, instances: List[dict]):
+        version, model = self._current
+        if model is None:
+            raise RuntimeError(f"No '{self.model_name}' model loaded yet")
+        import pandas as pd
+
+        df = pd.DataFrame.from_records(instances)
+        probas = model.predict_proba(df)[:, 1]
+        # labelled like the KServe predictor, without a second pass over the rows
+        negative, positive = model.classes_
+        labels = np.where(probas >= self.threshold, positive, negative)
+        return labels.tolist(), probas.tolist(), version
+
+    async def score(self, instances: List[dict]):
+        # keep CPU-bound scoring off the event loop
+        return await asyncio.to_thread(self.predict, instances)
+
+    def stats(self) -> dict:
+        return {"version": self.version, "reloads": self.reloads}
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class FeatureSchemaCache:
+    """Model feature ordering per Feast feature service.
+
+    The ordering only changes when the Feast registry changes, so entries live for
+    `ttl_s` seconds and are dropped as soon as a newer registry version is reported.
+    Expired entries are kept around so they can still be served if Feast is down.
+    """
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self.registry_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[List[str], float]] = {}
+
+    def get(self, feature_service: str, allow_stale: bool = False) -> Optional[List[str]]:
+        entry = self._entries.get(feature_service)
+        if entry is not None:
+            feature_names, fetched_at = entry
+            if allow_stale or time.monotonic() - fetched_at < self.ttl_s:
+                self.hits += 1
+                return feature_names
+        self.misses += 1
+        return None
+
+    def put(self, feature_service: str, feature_names: List[str]):
+        self._entries[feature_service] = (feature_names, time.monotonic())
+
+    def invalidate(self, feature_service: Optional[str] = None):
+        if feature_service is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(feature_service, None)
+
+    def set_registry_version(self, registry_version: str) -> bool:
+        """Record the current registry version, invalidating everything if it changed."""
+        if registry_version == self.registry_version:
+            return False
+        self.registry_version = registry_version
+        self.invalidate()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "registry_version": self.registry_version,
+        }
+
+
+class OnlineFeatureCache:
+    """Bounded LRU + TTL cache of online feature vectors keyed by employee_id.
+
+    The feature view is materialized in batches and rarely changes between runs, so
+    vectors are reused until they expire, fall out of the LRU, or are invalidated
+    after `materialize_incremental`.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Any, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    def get(self, employee_id) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(employee_id)
+        if entry is not None:
+            features, fetched_at = entry
+            if time.monotonic() - fetched_at < self.ttl_s:
+                self._entries.move_to_end(employee_id)
+                self.hits += 1
+                return features
+            del self._entries[employee_id]
+        self.misses += 1
+        return None
+
+    def put(self, employee_id, features: Dict[str, Any]):
+        self._entries[employee_id] = (features, time.monotonic())
+        self._entries.move_to_end(employee_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, employee_ids: Optional[Iterable] = None) -> int:
+        if employee_ids is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            removed = sum(self._entries.pop(employee_id, None) is not None for employee_id in employee_ids)
+        self.invalidations += 1
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class FeastRegistryWatcher:
+    """Polls the Feast SQL registry for changes made by `feast apply` or `feast materialize`.
+
+    Both rewrite the affected feature view / feature service rows with a new
+    `last_updated_timestamp`, so the newest of those timestamps is the registry version.
+    Every worker polls on its own, `on_change(version)` runs in each of them when the
+    version moves; the version is None until the registry has answered.
+    """
+
+    QUERY = (
+        "SELECT (SELECT max(last_updated_timestamp) FROM feature_views WHERE project_id = :project),"
+        " (SELECT max(last_updated_timestamp) FROM feature_services WHERE project_id = :project)"
+    )
+
+    def __init__(self, registry_url: str, project: str, on_change: Callable[[str], None], poll_interval_s: float = 30):
+        self.registry_url = registry_url
+        self.project = project
+        self.on_change = on_change
+        self.poll_interval_s = poll_interval_s
+        self.version: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        # sqlalchemy loads the driver named in the URL here, so a missing one fails at startup
+        self._engine = self._create_engine()
+
+    def _create_engine(self):
+        try:
+            import sqlalchemy
+
+            return sqlalchemy.create_engine(self.registry_url, pool_size=1, pool_pre_ping=True)
+        except ImportError as e:
+            raise RuntimeError(
+                f"FEAST_REGISTRY_URL needs sqlalchemy and the database driver of {self.registry_url.split(':', 1)[0]} "
+                f"(pip install sqlalchemy 'psycopg[binary]' for postgresql+psycopg): {e}"
+            ) from e
+
+    async def start(self):
+        if self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    def _read_version(self) -> str:
+        import sqlalchemy
+
+        if self._engine is None:
+            self._engine = self._create_engine()
+        with self._engine.connect() as conn:
+            feature_views, feature_services = conn.execute(sqlalchemy.text(self.QUERY), {"project": self.project}).one()
+        return f"{feature_views}:{feature_services}"
+
+    async def refresh(self):
+        try:
+            # blocking driver call, kept off the event loop
+            latest = await asyncio.to_thread(self._read_version)
+        except Exception as e:
+            # keep the caches on their TTLs until the registry is reachable again
+            print(f"Error checking the Feast registry version: {e}")
+            return
+        if latest != self.version:
+            print(f"Feast registry version is now {latest} (was {self.version})")
+            self.version = latest
+            self.on_change(latest)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval_s)
+            await self.refresh()
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+
+class DependencyClient:
+    """Shared async HTTP client for one downstream dependency (Feast, KServe, monitoring).
+
+    Connections are kept alive and pooled across requests, every call is bounded by
+    the dependency's own timeout, and at most `max_concurrency` calls are in flight
+    at once so a slow dependency cannot soak up the whole worker. `deadline_s` bounds
+    the whole call, including the wait for a free concurrency slot.
+    """
+
+    def __init__(self, name: str, timeout_s: float, max_connections: int, max_concurrency: Optional[int] = None, deadline_s: Optional[float] = None):
+        self.name = name
+        self.deadline_s = deadline_s
+        self.timeout = httpx.Timeout(timeout_s)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._semaphore = asyncio.Semaphore(max_concurrency or max_connections)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        if self._client is None:
+            raise RuntimeError(f"{self.name} client is not started")
+        if self.deadline_s is None:
+            return await self._post(url, **kwargs)
+        try:
+            return await asyncio.wait_for(self._post(url, **kwargs), self.deadline_s)
+        except asyncio.TimeoutError:
+            raise httpx.TimeoutException(f"{self.name} call exceeded its {self.deadline_s}s deadline")
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            return await self._client.post(url, **kwargs)
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import httpx
+
+from http_clients import DependencyClient
+
+
+class MetricsShipper:
+    """Ships inference metrics to the monitoring service off the request path.
+
+    `submit` only puts the metric on a bounded in-process queue (dropping it when the
+    queue is full); a background task drains the queue and POSTs batches to the
+    monitoring `/log/batch` endpoint. Monitoring being slow or down never adds to
+    request latency, it shows up in the counters instead.
+    """
+
+    def __init__(self, client: DependencyClient, url: str, max_queue: int = 10000, batch_size: int = 200, flush_interval_s: float = 1.0):
+        self.client = client
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def submit(self, metric: dict):
+        metric.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        try:
+            self._queue.put_nowait(metric)
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            # let the flusher finish its current batch instead of cancelling it mid-send
+            self._stopping.set()
+            await self._task
+            self._task = None
+        # ship whatever is still queued before shutting down
+        while not self._queue.empty():
+            await self._send(self._drain(self.batch_size))
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            batch = await self._collect()
+            if batch:
+                await self._send(batch)
+
+    async def _collect(self) -> List[dict]:
+        # wait at most one flush interval, returning early once a full batch is queued
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval_s
+        batch = []
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _send(self, batch: List[dict]):
+        try:
+            response = await self.client.post(self.url, json=batch)
+            response.raise_for_status()
+            self.sent += len(batch)
+        except (httpx.HTTPError, RuntimeError) as e:
+            self.failed += len(batch)
+            print(f"Error sending {len(batch)} metrics to monitoring service: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
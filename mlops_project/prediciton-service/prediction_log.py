@@ -0,0 +1,316 @@
+import argparse
+import math
+import os
+import glob
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# employee_attrition_features (feature_store/features.py), the model input of every logged request
+MODEL_FEATURES = [
+    "Age", "Company Reputation", "Company Size", "Company Tenure", "Education Level",
+    "Employee Recognition", "Job Level", "Job Satisfaction", "Monthly Income",
+    "Number of Dependents", "Number of Promotions", "Opportunities", "Overtime",
+    "Performance Rating", "Remote Work", "Work-Life Balance", "Years at Company",
+]
+
+
+def input_log_schema() -> "pa.Schema":
+    """Model input rows as scored: float features, like the model receives them."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [("employee_id", pa.int64())]
+        + [(name, pa.float64()) for name in MODEL_FEATURES]
+        + [("request_id", pa.string()), ("logged_at", pa.timestamp("us", tz="UTC"))]
+    )
+
+
+def prediction_log_schema() -> "pa.Schema":
+    import pyarrow as pa
+
+    return pa.schema([
+        ("employee_id", pa.int64()),
+        ("attrition_label", pa.int64()),
+        ("prediction", pa.float64()),
+        ("risk_level", pa.string()),
+        ("recommendation", pa.string()),
+        ("request_id", pa.string()),
+        ("logged_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def _as_int(value) -> int:
+    if isinstance(value, int):
+        return int(value)
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not an integer")
+    return int(number)
+
+
+def _as_timestamp(value) -> datetime:
+    if not isinstance(value, datetime):
+        raise ValueError(f"{value!r} is not a datetime")
+    return value
+
+
+def _converter(data_type: "pa.DataType") -> Callable[[Any], Any]:
+    import pyarrow as pa
+
+    if pa.types.is_floating(data_type):
+        return float
+    if pa.types.is_integer(data_type):
+        return _as_int
+    if pa.types.is_string(data_type):
+        return str
+    if pa.types.is_timestamp(data_type):
+        return _as_timestamp
+    raise TypeError(f"No log converter for {data_type}")
+
+
+def row_converter(schema: "pa.Schema") -> Callable[[dict], Dict[str, Any]]:
+    """Function turning a record into a row of `schema`; raises ValueError/TypeError when a value does not fit.
+
+    Numeric strings such as "12" are accepted, missing keys and NaN become null and
+    extra keys are dropped.
+    """
+    converters = [(field.name, _converter(field.type)) for field in schema]
+
+    def convert(record: dict) -> Dict[str, Any]:
+        row = {}
+        for name, convert_value in converters:
+            value = record.get(name)
+            missing = value is None or (isinstance(value, float) and math.isnan(value))
+            row[name] = None if missing else convert_value(value)
+        return row
+
+    return convert
+
+
+class PredictionLogWriter:
+    """Buffered, append-only log of request/prediction rows.
+
+    Rows are kept in memory and flushed by a background thread into immutable
+    Parquet segments inside `log_dir`, so a request never reads or rewrites the
+    history. Every writer only names (and compacts) its own segments, which keeps
+    several uvicorn workers writing to the same directory safe. Every segment is
+    written with `schema` (missing fields are null, extra keys are dropped), so the
+    directory reads as one table with `pd.read_parquet(log_dir)`.
+
+    Rows are converted to the schema on `append`; a row that does not fit is dropped
+    (and counted) there, so it can never block the segments after it. At most
+    `max_buffer_rows` rows wait for a flush, the oldest are dropped beyond that
+    (e.g. while the disk is full).
+    """
+
+    def __init__(self, log_dir: str, schema: "pa.Schema", flush_rows: int = 500, flush_interval_s: float = 5.0, compact_after: int = 50,
+                 max_buffer_rows: int = 100000):
+        self.log_dir = log_dir
+        self.schema = schema
+        self.max_buffer_rows = max_buffer_rows
+        self.rejected = 0
+        self.dropped = 0
+        self._convert = row_converter(schema)
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.compact_after = compact_after
+        self.writer_id = uuid.uuid4().hex[:8]
+
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = 0
+
+        os.makedirs(self.log_dir, exist_ok=True)
+
+    def append(self, records: List[dict]):
+        rows = []
+        for record in records:
+            try:
+                rows.append(self._convert(record))
+            except (TypeError, ValueError) as e:
+                self.rejected += 1
+                print(f"Dropped log row for {self.log_dir} that does not match its schema: {e}")
+        with self._lock:
+            self._buffer.extend(rows)
+            self._trim()
+            buffered = len(self._buffer)
+        if buffered >= self.flush_rows:
+            self._wakeup.set()
+
+    def _trim(self):
+        # called with self._lock held
+        overflow = len(self._buffer) - self.max_buffer_rows
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            print(f"Log buffer for {self.log_dir} is full, dropped the {overflow} oldest rows")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"log-writer-{self.writer_id}", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval_s)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # the writer thread must outlive any single failed flush
+                print(f"Error in log writer for {self.log_dir}: {e}")
+
+    def flush(self):
+        import pyarrow as pa
+
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+            if not records:
+                return
+
+            try:
+                self._seq += 1
+                _write_parquet_atomic(pa.Table.from_pylist(records, schema=self.schema), self.log_dir, f"part-{self.writer_id}-{self._seq:06d}.parquet")
+            except Exception as e:
+                # keep the rows for the next flush instead of losing them
+                print(f"Error flushing log segment to {self.log_dir}: {e}")
+                with self._lock:
+                    self._buffer[:0] = records
+                    self._trim()
+                return
+
+            segments = sorted(glob.glob(os.path.join(self.log_dir, f"part-{self.writer_id}-*.parquet")))
+            if len(segments) >= self.compact_after:
+                self._seq += 1
+                try:
+                    compact_segments(self.log_dir, segments, f"compacted-{self.writer_id}-{self._seq:06d}.parquet", self.schema)
+                except Exception as e:
+                    # the segments stay as they are, compaction is retried after the next flush
+                    print(f"Error compacting log segments in {self.log_dir}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"buffered": buffered, "rejected": self.rejected, "dropped": self.dropped}
+
+
+def _write_parquet_atomic(data, log_dir: str, name: str):
+    """Write a pandas DataFrame or a pyarrow Table as `log_dir/name`."""
+    import pyarrow.parquet as pq
+
+    # readers skip dot-files, so a half-written segment is never visible
+    tmp_path = os.path.join(log_dir, f".{name}.tmp")
+    if hasattr(data, "to_parquet"):
+        data.to_parquet(tmp_path, index=False)
+    else:
+        pq.write_table(data, tmp_path)
+    os.replace(tmp_path, os.path.join(log_dir, name))
+
+
+def conform(table: "pa.Table", schema: "pa.Schema") -> "pa.Table":
+    """`table` with exactly the fields of `schema`: columns cast, missing ones null."""
+    import pyarrow as pa
+
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def compact_segments(log_dir: str, segments: List[str], name: str, schema: "pa.Schema"):
+    """Merge `segments` into a single Parquet file and remove the originals."""
+    if len(segments) < 2:
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    merged = pa.concat_tables([conform(pq.read_table(path), schema) for path in segments])
+    _write_parquet_atomic(merged, log_dir, name)
+    for path in segments:
+        os.remove(path)
+    print(f"Compacted {len(segments)} segments into {name}")
+
+
+def compact_log(log_dir: str, schema: "pa.Schema", min_age_s: float = 3600):
+    """Offline compaction of every segment older than `min_age_s`, e.g. left behind by restarted workers.
+
+    Segments written before the log had a fixed schema are conformed to `schema` on the way.
+    """
+    cutoff = time.time() - min_age_s
+    segments = sorted(
+        path for path in glob.glob(os.path.join(log_dir, "*.parquet"))
+        if os.path.getmtime(path) < cutoff
+    )
+    compact_segments(log_dir, segments, f"compacted-{uuid.uuid4().hex[:8]}-offline.parquet", schema)
+
+
+def import_csv_history(input_csv: str, prediction_csv: str, input_dir: str, prediction_dir: str, logged_at: Optional[float] = None):
+    """Convert the CSV logs written before the parquet log into one segment per log.
+
+    The CSVs carry no request_id: rows were paired by line number (which is how
+    model_retrain.py used to join them), so each pair gets a generated request_id and
+    `logged_at` (default: the input CSV's modification time).
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    inputs, predictions = pd.read_csv(input_csv), pd.read_csv(prediction_csv)
+    if len(inputs) != len(predictions):
+        print(f"{input_csv} has {len(inputs)} rows and {prediction_csv} {len(predictions)}, importing the first {min(len(inputs), len(predictions))} pairs")
+    rows = min(len(inputs), len(predictions))
+    stamp = pd.Timestamp(logged_at if logged_at is not None else os.path.getmtime(input_csv), unit="s", tz="UTC")
+    keys = {"request_id": [uuid.uuid4().hex for _ in range(rows)], "logged_at": [stamp] * rows}
+    if "employee_id" not in predictions and "employee_id" in inputs:
+        predictions["employee_id"] = inputs["employee_id"]
+
+    name = f"imported-{uuid.uuid4().hex[:8]}.parquet"
+    for frame, log_dir, schema in ((inputs, input_dir, input_log_schema()), (predictions, prediction_dir, prediction_log_schema())):
+        os.makedirs(log_dir, exist_ok=True)
+        table = pa.Table.from_pandas(frame.head(rows).assign(**keys), preserve_index=False)
+        _write_parquet_atomic(conform(table, schema), log_dir, name)
+        print(f"Imported {rows} rows into {os.path.join(log_dir, name)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance of the request/prediction logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    imported = commands.add_parser("import-csv", help=import_csv_history.__doc__.splitlines()[0])
+    imported.add_argument("input_csv")
+    imported.add_argument("prediction_csv")
+    imported.add_argument("input_dir")
+    imported.add_argument("prediction_dir")
+    compacted = commands.add_parser("compact", help="merge segments older than --min-age seconds")
+    compacted.add_argument("log_dir")
+    compacted.add_argument("--kind", choices=["input", "prediction"], required=True)
+    compacted.add_argument("--min-age", type=float, default=3600)
+    args = parser.parse_args()
+
+    if args.command == "import-csv":
+        import_csv_history(args.input_csv, args.prediction_csv, args.input_dir, args.prediction_dir)
+    else:
+        compact_log(args.log_dir, input_log_schema() if args.kind == "input" else prediction_log_schema(), args.min_age)
+
+
+if __name__ == "__main__":
+    main()
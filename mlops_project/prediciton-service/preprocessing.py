@@ -0,0 +1,160 @@
+import bisect
+import math
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# ==== Define encoder logic same as your data-preparation.py ====
+encoder_columns = [
+    'Work-Life Balance', 'Job Satisfaction', 'Performance Rating',
+    'Education Level', 'Job Level', 'Company Size',
+    'Company Reputation', 'Employee Recognition'
+]
+encoder_categories = [
+    ['Poor', 'Fair', 'Good', 'Excellent'],
+    ['Low', 'Medium', 'High', 'Very High'],
+    ['Low', 'Below Average', 'Average', 'High'],
+    ["High School", "Bachelor’s Degree", "Master’s Degree", "Associate Degree", "PhD"],
+    ['Entry', 'Mid', 'Senior'],
+    ['Small', 'Medium', 'Large'],
+    ['Poor', 'Fair', 'Good', 'Excellent'],
+    ['Low', 'Medium', 'High', 'Very High'],
+]
+
+# Ordinal codes per column, same as OrdinalEncoder(categories=encoder_categories,
+# handle_unknown='use_encoded_value', unknown_value=-1) but without importing sklearn
+# or fitting it on dummy rows at import time
+encoder_tables = {
+    col: {category: code for code, category in enumerate(categories)}
+    for col, categories in zip(encoder_columns, encoder_categories)
+}
+
+
+# Boolean mapping
+bool_cols_map = {
+    'Overtime': {'No': 0, 'Yes': 1},
+    'Remote Work': {'No': 0, 'Yes': 1},
+    'Opportunities': {'No': 0, 'Yes': 1}
+}
+
+# Monthly Income buckets (inclusive ranges), anything outside maps to -1
+INCOME_BINS = [(1200, 10000), (10001, 20000), (20001, 35000), (35001, 50000), (50001, np.inf)]
+# Age bucket edges: <25 -> 0, 25-34 -> 1, 35-44 -> 2, 45-54 -> 3, else 4
+AGE_EDGES = [25, 35, 45, 55]
+
+
+def map_income(income: "pd.Series") -> "pd.Series":
+    import pandas as pd
+
+    values = pd.to_numeric(income, errors="coerce").to_numpy(dtype=float)
+    conditions = [(values >= low) & (values <= high) for low, high in INCOME_BINS]
+    return pd.Series(np.select(conditions, range(len(INCOME_BINS)), default=-1), index=income.index)
+
+
+def age_mapping(age: "pd.Series") -> "pd.Series":
+    import pandas as pd
+
+    # NaN sorts past the last edge, so missing ages land in the last bucket like before
+    values = pd.to_numeric(age, errors="coerce").to_numpy(dtype=float)
+    return pd.Series(np.searchsorted(AGE_EDGES, values, side="right"), index=age.index)
+
+
+def preprocess_records(records: List[dict]) -> "pd.DataFrame":
+    import pandas as pd
+
+    # column-wise preprocessing, one pass for the whole batch
+    df = pd.DataFrame.from_records(records)
+
+    for col, mapping in bool_cols_map.items():
+        if col in df.columns:
+            df[col] = df[col].map(mapping).fillna(-1).astype(int) # Fillna for robustness if category missing
+
+    if 'Monthly Income' in df:
+        df['Monthly Income'] = map_income(df['Monthly Income'])
+
+    if 'Age' in df:
+        df['Age'] = age_mapping(df['Age'])
+
+    # Apply Ordinal Encoding
+    for col in encoder_columns:
+        if col not in df.columns:
+            print(f"⚠️ Column '{col}' expected for ordinal encoding not found. Adding with default -1.")
+            df[col] = -1 # Add missing column with a default encoded value
+            continue
+        df[col] = df[col].map(encoder_tables[col]).fillna(-1).astype(int)
+    return df
+
+
+def preprocess_input(data: dict):
+    df = preprocess_records([data])
+    print(f"df length: {len(df.columns)}")
+    return df
+
+
+def income_code(value) -> int:
+    # scalar version of map_income
+    try:
+        income = float(value)
+    except (TypeError, ValueError):
+        return -1
+    for code, (low, high) in enumerate(INCOME_BINS):
+        if low <= income <= high:
+            return code
+    return -1
+
+
+def age_code(value) -> int:
+    # scalar version of age_mapping
+    try:
+        age = float(value)
+    except (TypeError, ValueError):
+        age = math.nan
+    if math.isnan(age):
+        return len(AGE_EDGES)
+    return bisect.bisect_right(AGE_EDGES, age)
+
+
+def _as_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+class CompiledPreprocessor:
+    """Single-record fast path: request dict -> model feature vector without pandas.
+
+    The ordinal encoder categories, bool maps and income/age bins are turned into
+    dictionary lookups once; for every feature ordering a plan of per-column
+    converters is built on first use and reused afterwards. Features the request does
+    not contain come out as NaN so the caller can backfill or default them, except
+    ordinal encoder columns, which `preprocess_records` adds as -1 (unknown category).
+    Produces the same values as `preprocess_records` followed by `reindex`.
+    """
+
+    def __init__(self):
+        self._converters: Dict[str, Callable] = {}
+        for col, lookup in encoder_tables.items():
+            self._converters[col] = lambda value, lookup=lookup: lookup.get(value, -1)
+        for col, mapping in bool_cols_map.items():
+            self._converters[col] = lambda value, mapping=mapping: mapping.get(value, -1)
+        self._converters['Monthly Income'] = income_code
+        self._converters['Age'] = age_code
+        self._plans: Dict[Tuple[str, ...], Tuple[List[Tuple[str, Callable]], np.ndarray]] = {}
+
+    def _plan(self, feature_order: Tuple[str, ...]) -> Tuple[List[Tuple[str, Callable]], np.ndarray]:
+        plan = self._plans.get(feature_order)
+        if plan is None:
+            converters = [(name, self._converters.get(name, _as_float)) for name in feature_order]
+            defaults = np.array([-1.0 if name in encoder_tables else np.nan for name in feature_order])
+            plan = self._plans[feature_order] = (converters, defaults)
+        return plan
+
+    def transform(self, data: dict, feature_order: List[str]) -> np.ndarray:
+        converters, defaults = self._plan(tuple(feature_order))
+        vector = defaults.copy()
+        for i, (name, convert) in enumerate(converters):
+            if name in data:
+                vector[i] = convert(data[name])
+        return vector
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive failures of a dependency.
+
+    While open, calls are rejected for `reset_timeout_s` seconds; after that a single
+    trial call is let through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout_s:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release(self):
+        # the call was abandoned (e.g. a cancelled hedge), its outcome says nothing
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self._opened_at is None:
+                print(f"Circuit breaker for {self.name} opened after {self.consecutive_failures} failures")
+                self.opened += 1
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+async def hedged(attempts: List[Callable[[], Awaitable[T]]], hedge_after_s: float) -> T:
+    """Run `attempts` in order, starting the next one only if none has succeeded after
+    `hedge_after_s` (or as soon as the running ones have all failed).
+
+    The first successful result wins and the remaining attempts are cancelled; if all
+    of them fail, the error of the last one to fail is raised.
+    """
+    pending = set()
+    remaining = list(attempts)
+    last_error: Optional[BaseException] = None
+    try:
+        while remaining or pending:
+            if remaining and not pending:
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=hedge_after_s if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+            if not done and remaining:
+                # slow response: race the next replica against the one still running
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
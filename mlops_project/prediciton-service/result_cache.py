@@ -0,0 +1,128 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import httpx
+
+from http_clients import DependencyClient
+
+
+class PredictionResultCache:
+    """Bounded LRU cache of model outputs keyed by the final model input row.
+
+    Every model input is ordinal or binned, so many employees end up with the exact
+    same feature vector. Entries belong to the model version that produced them, as
+    reported with each prediction: a result is only stored when that version is the
+    current one, the cache is emptied as soon as a different version becomes current,
+    and nothing is cached while the current version is unknown.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.model_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[tuple, Tuple[Any, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(instance: dict) -> tuple:
+        # the row is already in model feature order, so its items identify the input
+        return tuple(instance.items())
+
+    def set_model_version(self, model_version: Optional[str]) -> bool:
+        """Record the serving model version, dropping every entry if it changed."""
+        if model_version == self.model_version:
+            return False
+        self.model_version = model_version
+        if self._entries:
+            self._entries.clear()
+            self.invalidations += 1
+        return True
+
+    def get(self, instance: dict) -> Optional[Tuple[Any, float]]:
+        if self.model_version is None:
+            return None
+        key = self._key(instance)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, instance: dict, label, proba: float, model_version: Optional[str]):
+        # results scored by any other version (a predictor worker that has not reloaded
+        # yet, or already has) are not kept
+        if model_version is None or model_version != self.model_version:
+            return
+        key = self._key(instance)
+        self._entries[key] = (label, proba)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class RegistryVersionWatcher:
+    """Polls the MLflow registry REST API for the version currently in `stage`.
+
+    Used when the model is served by KServe, where the prediction service has no
+    model of its own to ask; the version is None until the registry has answered.
+    """
+
+    def __init__(self, client: DependencyClient, tracking_uri: str, model_name: str, stage: str, poll_interval_s: float = 60):
+        self.client = client
+        self.url = f"{tracking_uri.rstrip('/')}/api/2.0/mlflow/registered-models/get-latest-versions"
+        self.model_name = model_name
+        self.stage = stage
+        self.poll_interval_s = poll_interval_s
+        self.version: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self):
+        try:
+            response = await self.client.post(self.url, json={"name": self.model_name, "stages": [self.stage]})
+            response.raise_for_status()
+            versions = response.json().get("model_versions", [])
+        except (httpx.HTTPError, RuntimeError, ValueError) as e:
+            # keep the last known version until the registry is reachable again
+            print(f"Error checking registry for the {self.stage} model version: {e}")
+            return
+        latest = versions[0]["version"] if versions else None
+        if latest != self.version:
+            print(f"'{self.model_name}' {self.stage} version is now {latest}")
+            self.version = latest
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval_s)
+            await self.refresh()
@@ -0,0 +1,92 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+LATENCY_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/max and approximate percentiles."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is the +Inf bucket
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def percentile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        with self._lock:
+            if self._count == 0:
+                return 0.0
+            rank = q * self._count
+            seen = 0
+            for upper, count in zip(self.buckets, self._counts):
+                seen += count
+                if seen >= rank:
+                    return upper
+            return self._max
+
+    def snapshot(self) -> dict:
+        p50, p95, p99 = self.percentile(0.5), self.percentile(0.95), self.percentile(0.99)
+        with self._lock:
+            return {
+                "count": self._count,
+                "mean": round(self._sum / self._count, 3) if self._count else 0.0,
+                "max": round(self._max, 3),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "buckets": {
+                    **{str(upper): count for upper, count in zip(self.buckets, self._counts)},
+                    "+Inf": self._counts[-1],
+                },
+            }
+
+
+class StageTimer:
+    """Wall-clock time spent in each stage of one request, in milliseconds."""
+
+    def __init__(self):
+        self.stages_ms: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class StageHistograms:
+    """Per-stage latency histograms aggregated over all requests of an endpoint."""
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stages_ms: Dict[str, float]):
+        for name, value in stages_ms.items():
+            with self._lock:
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in histograms.items()}
@@ -0,0 +1,37 @@
+import asyncio
+
+from batcher import MicroBatcher
+
+
+def test_dispatches_are_held_and_counted_until_they_finish():
+    async def scenario():
+        release = asyncio.Event()
+        calls = []
+
+        async def score(instances):
+            calls.append(len(instances))
+            await release.wait()
+            return [0] * len(instances), [0.5] * len(instances), "1"
+
+        batcher = MicroBatcher(score, max_wait_ms=50)
+        await batcher.start()
+        first = asyncio.create_task(batcher.submit({"row": 0}))
+        while not calls:
+            await asyncio.sleep(0)
+        assert batcher.stats()["in_flight_batches"] == 1
+        assert len(batcher._dispatches) == 1
+
+        # rows arriving while a batch is being scored are gathered into one call
+        others = [asyncio.create_task(batcher.submit({"row": i})) for i in (1, 2)]
+        while len(calls) < 2:
+            await asyncio.sleep(0.001)
+        release.set()
+        results = await asyncio.gather(first, *others)
+        await batcher.close()
+        return calls, results, batcher
+
+    calls, results, batcher = asyncio.run(scenario())
+    assert calls == [1, 2]
+    assert results == [(0, 0.5, "1")] * 3
+    assert batcher.stats()["in_flight_batches"] == 0
+    assert not batcher._dispatches
@@ -0,0 +1,31 @@
+import random
+
+from fastapi.testclient import TestClient
+
+import app
+from prediction_log import PredictionLogWriter, input_log_schema, prediction_log_schema
+from test_preprocessing import FEATURE_ORDER, random_record
+
+
+def test_batch_record_without_employee_id(tmp_path, monkeypatch):
+    async def feature_order(emp_id):
+        return FEATURE_ORDER
+
+    async def score(instances):
+        return [0] * len(instances), [0.25] * len(instances)
+
+    monkeypatch.setattr(app, "get_model_feature_order", feature_order)
+    monkeypatch.setattr(app, "predict_instances", score)
+    monkeypatch.setattr(app, "input_log", PredictionLogWriter(str(tmp_path / "input"), input_log_schema()))
+    monkeypatch.setattr(app, "prediction_log", PredictionLogWriter(str(tmp_path / "output"), prediction_log_schema()))
+    monkeypatch.setattr(app, "log_metrics_service", lambda data: None)
+
+    rng = random.Random(0)
+    with_id, without_id = random_record(rng), random_record(rng)
+    without_id.pop("employee_id")
+    response = TestClient(app.app).post("/predict/batch", json={"records": [with_id, without_id]})
+
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert [prediction["employee_id"] for prediction in predictions] == [with_id["employee_id"], None]
+    assert app.input_log.stats()["buffered"] == 2
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import prediction_log
+from prediction_log import PredictionLogWriter, input_log_schema
+
+LOGGED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def input_row(request_id: str, **values) -> dict:
+    row = {name: 1 for name in prediction_log.MODEL_FEATURES}
+    row.update(employee_id=7, request_id=request_id, logged_at=LOGGED_AT)
+    row.update(values)
+    return row
+
+
+def test_rows_that_do_not_fit_are_dropped_without_blocking_later_flushes(tmp_path):
+    writer = PredictionLogWriter(str(tmp_path), input_log_schema())
+    writer.append([
+        input_row("numeric-string", **{"Company Tenure": "12"}),
+        input_row("bad", **{"Company Tenure": "twelve"}),
+        input_row("missing-id", employee_id=float("nan")),
+    ])
+    writer.flush()
+    writer.append([input_row("next")])
+    writer.flush()
+
+    logged = pd.read_parquet(tmp_path).set_index("request_id")
+    assert sorted(logged.index) == ["missing-id", "next", "numeric-string"]
+    assert logged.loc["numeric-string", "Company Tenure"] == 12.0
+    assert pd.isna(logged.loc["missing-id", "employee_id"])
+    assert writer.stats() == {"buffered": 0, "rejected": 1, "dropped": 0}
+
+
+def test_buffer_keeps_the_newest_rows_up_to_its_limit(tmp_path):
+    writer = PredictionLogWriter(str(tmp_path), input_log_schema(), max_buffer_rows=3)
+    writer.append([input_row(str(i)) for i in range(5)])
+    assert writer.stats()["dropped"] == 2
+    writer.flush()
+    assert sorted(pd.read_parquet(tmp_path)["request_id"]) == ["2", "3", "4"]
+
+
+def test_failed_compaction_keeps_the_segments(tmp_path, monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(prediction_log, "compact_segments", fail)
+    writer = PredictionLogWriter(str(tmp_path), input_log_schema(), compact_after=2)
+    for i in range(3):
+        writer.append([input_row(str(i))])
+        writer.flush()
+    assert len(pd.read_parquet(tmp_path)) == 3
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OrdinalEncoder
+
+from preprocessing import CompiledPreprocessor, encoder_categories, encoder_columns, preprocess_input, preprocess_records
+
+# sorted feature order of the employee_attrition_features feature service
+FEATURE_ORDER = sorted([
+    "Age", "Company Reputation", "Company Size", "Company Tenure",
+    "Education Level", "Employee Recognition", "Job Level",
+    "Job Satisfaction", "Monthly Income", "Number of Dependents",
+    "Number of Promotions", "Opportunities", "Overtime",
+    "Performance Rating", "Remote Work", "Work-Life Balance",
+    "Years at Company",
+])
+
+
+def random_record(rng: random.Random) -> dict:
+    record = {
+        "employee_id": rng.randint(1, 100000),
+        "Age": rng.choice([18, 24, 24.9, 25, 34, 35, 44.5, 45, 54, 55, 70, "31"]),
+        "Monthly Income": rng.choice([0, 1199, 1200, 10000, 10000.5, 10001, 20000, 35000, 35001, 50000, 50001, 250000, "8000"]),
+        "Overtime": rng.choice(["Yes", "No", "Maybe"]),
+        "Remote Work": rng.choice(["Yes", "No"]),
+        "Opportunities": rng.choice(["Yes", "No"]),
+        "Years at Company": rng.randint(0, 40),
+        "Number of Promotions": rng.randint(0, 5),
+        "Number of Dependents": rng.randint(0, 6),
+        "Company Tenure": rng.randint(0, 120),
+    }
+    for col, categories in zip(encoder_columns, encoder_categories):
+        record[col] = rng.choice(categories + ["Unknown"])
+    # some requests leave out numeric, categorical or boolean features
+    optional = ["Years at Company", "Number of Dependents", "Company Tenure", "Overtime", "Remote Work", "Opportunities"] + encoder_columns
+    for col in rng.sample(optional, rng.randint(0, 4)):
+        del record[col]
+    return record
+
+
+def test_compiled_matches_pandas_path():
+    rng = random.Random(42)
+    compiled = CompiledPreprocessor()
+    for _ in range(500):
+        record = random_record(rng)
+        expected = preprocess_input(dict(record)).reindex(columns=FEATURE_ORDER, fill_value=0).to_numpy(dtype=float)[0]
+        vector = compiled.transform(record, FEATURE_ORDER)
+        # features missing from the request come back as NaN and are defaulted by the caller
+        vector = np.where(np.isnan(vector), 0, vector)
+        np.testing.assert_array_equal(vector, expected, err_msg=f"mismatch for {record}")
+
+
+def test_compiled_reuses_plan_per_feature_order():
+    compiled = CompiledPreprocessor()
+    record = random_record(random.Random(0))
+    compiled.transform(record, FEATURE_ORDER)
+    compiled.transform(record, list(FEATURE_ORDER))
+    compiled.transform(record, FEATURE_ORDER[::-1])
+    assert len(compiled._plans) == 2
+
+
+def test_encoder_tables_match_ordinal_encoder():
+    values = pd.DataFrame({
+        col: (categories + ["Unknown", "poor"] * 3)[:8]
+        for col, categories in zip(encoder_columns, encoder_categories)
+    })
+    oe = OrdinalEncoder(categories=encoder_categories, handle_unknown='use_encoded_value', unknown_value=-1)
+    oe.fit(pd.DataFrame([[categories[0] for categories in encoder_categories]], columns=encoder_columns))
+    expected = oe.transform(values).astype(int)
+    actual = preprocess_records(values.to_dict(orient="records"))[encoder_columns].to_numpy()
+    np.testing.assert_array_equal(actual, expected)
+
+
+if __name__ == "__main__":
+    test_compiled_matches_pandas_path()
+    test_compiled_reuses_plan_per_feature_order()
+    test_encoder_tables_match_ordinal_encoder()
+    print("Compiled preprocessing matches the pandas path")
@@ -0,0 +1,61 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Open Inference Protocol (V2) REST with the binary tensor data extension: the body is
+# the JSON header followed by the raw little-endian tensor bytes, and this header
+# tells where the JSON ends.
+HEADER_LENGTH = "Inference-Header-Content-Length"
+
+DATATYPES = {
+    "BOOL": np.dtype("?"),
+    "INT8": np.dtype("<i1"), "INT16": np.dtype("<i2"), "INT32": np.dtype("<i4"), "INT64": np.dtype("<i8"),
+    "UINT8": np.dtype("<u1"), "UINT16": np.dtype("<u2"), "UINT32": np.dtype("<u4"), "UINT64": np.dtype("<u8"),
+    "FP16": np.dtype("<f2"), "FP32": np.dtype("<f4"), "FP64": np.dtype("<f8"),
+}
+
+OUTPUTS = ["predictions", "prediction_proba"]
+
+
+def encode_infer_request(instances: List[dict]) -> Tuple[bytes, Dict[str, str]]:
+    """One FP64 [rows, features] tensor; column names travel in the request parameters.
+
+    Request parameters must be scalars, so the names are sent as a JSON array string.
+    """
+    feature_names = list(instances[0])
+    features = np.array([[instance[name] for name in feature_names] for instance in instances], dtype="<f8")
+    raw = features.tobytes()
+    header = json.dumps({
+        "inputs": [{
+            "name": "input-0",
+            "shape": list(features.shape),
+            "datatype": "FP64",
+            "parameters": {"binary_data_size": len(raw)},
+        }],
+        "outputs": [{"name": name, "parameters": {"binary_data": True}} for name in OUTPUTS],
+        "parameters": {"feature_names": json.dumps(feature_names), "binary_data_output": True},
+    }).encode()
+    headers = {"Content-Type": "application/octet-stream", HEADER_LENGTH: str(len(header))}
+    return header + raw, headers
+
+
+def decode_infer_response(content: bytes, headers) -> Tuple[list, list, Optional[str]]:
+    header_length = headers.get(HEADER_LENGTH)
+    if header_length is None:
+        body, raw = json.loads(content), b""
+    else:
+        body, raw = json.loads(content[:int(header_length)]), memoryview(content)[int(header_length):]
+
+    tensors = {}
+    position = 0
+    for output in body["outputs"]:
+        dtype = DATATYPES[output["datatype"]]
+        size = (output.get("parameters") or {}).get("binary_data_size")
+        if size is None:
+            tensors[output["name"]] = np.asarray(output["data"], dtype=dtype)
+        else:
+            # zero-copy view over the response bytes
+            tensors[output["name"]] = np.frombuffer(raw[position:position + size], dtype=dtype)
+            position += size
+    return tensors["predictions"].tolist(), tensors["prediction_proba"].tolist(), body.get("model_version")
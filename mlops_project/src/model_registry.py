@@ -4,10 +4,14 @@ import mlflow.sklearn
 from mlflow.models.signature import infer_signature
 from dotenv import load_dotenv
 from mlflow.tracking import MlflowClient
+from src.onnx_export import log_onnx_model
 
 
 load_dotenv()
 
+# also log an ONNX export of the pipeline, served by the KServe predictor with MODEL_BACKEND=onnx
+EXPORT_ONNX = os.environ.get("EXPORT_ONNX", "false").lower() == "true"
+
 
 def promote_best_model_to_production(model_name="Employee Attrition Model", metric="f1_score"):
     client = MlflowClient()
@@ -103,6 +107,8 @@ def model_registry(name, model, X_train, y_pred, metrics, prediction_metrics, sy
             signature=infer_signature(X_train, y_pred), # mlflow.models.signature.
             input_example=X_train.iloc[[0]] # first row as example input
         )
+        if EXPORT_ONNX:
+            log_onnx_model(model, X_train.head(10000))
         # set tags
         mlflow.set_tags({
             "model_type": model.named_steps['classifier'].__class__.__name__,
@@ -3,13 +3,15 @@ from src.model_pipeline import run_pipeline
 
 historical_data = pd.read_parquet("../feature_store/data/employee_preprocessed_data.parquet")
 
-new_data = pd.read_csv("../raw_data/input_data.csv")
+# request/prediction logs are directories of parquet segments written by the prediction service
+new_data = pd.read_parquet("../raw_data/input_data")
+predictions = pd.read_parquet("../raw_data/prediction_output", columns=["request_id", "attrition_label"])
 
-new_data["attrition_label"] = pd.read_csv("../raw_data/prediction_output.csv")["attrition_label"]
+new_data = new_data.merge(predictions, on="request_id", how="inner")
 
 updated_dataset = pd.concat([historical_data, new_data], ignore_index=True)
 
-X = updated_dataset.drop(columns=['employee_id', 'event_timestamp', 'attrition_label'], errors='ignore')
+X = updated_dataset.drop(columns=['employee_id', 'event_timestamp', 'attrition_label', 'request_id', 'logged_at'], errors='ignore')
 y = updated_dataset['attrition_label']
 feature_names = X.columns.tolist()
 
@@ -0,0 +1,161 @@
+"""ONNX export of the trained scaler + classifier pipelines.
+
+At registration the pipeline is converted to ONNX, checked against the sklearn
+outputs and logged next to the MLflow model under `onnx/model.onnx`, so the KServe
+predictor can serve it with onnxruntime (MODEL_BACKEND=onnx). Column order and
+class labels travel in the ONNX metadata, the predictor needs no sklearn objects.
+
+Compare an already registered version:
+
+    python -m src.onnx_export --model-uri "models:/Employee Attrition Model/Production" \
+        --data feature_store/data/employee_preprocessed_data.parquet
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ONNX_ARTIFACT_PATH = "onnx"
+ONNX_FILE = "model.onnx"
+INPUT_NAME = "input"
+# float32 inputs: scaler and linear outputs differ from sklearn's float64 in the last digits
+PARITY_ATOL = float(os.environ.get("ONNX_PARITY_ATOL", "1e-4"))
+
+
+def _register_xgboost_converter():
+    try:
+        from xgboost import XGBClassifier
+    except ImportError:
+        return
+    from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+    from skl2onnx import update_registered_converter
+    from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+
+    update_registered_converter(
+        XGBClassifier, "XGBoostXGBClassifier",
+        calculate_linear_classifier_output_shapes, convert_xgboost,
+        options={"nocl": [True, False], "zipmap": [True, False, "columns"]},
+    )
+
+
+def to_onnx(model, feature_names) -> bytes:
+    """Serialized ONNX graph of the pipeline with one float [rows, features] input."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    _register_xgboost_converter()
+    classifier = model.steps[-1][1]
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[(INPUT_NAME, FloatTensorType([None, len(feature_names)]))],
+        # plain [rows, classes] probability tensor instead of a list of dicts
+        options={id(classifier): {"zipmap": False}},
+    )
+    for key, value in (("feature_names", list(feature_names)), ("classes", np.asarray(classifier.classes_).tolist())):
+        prop = onnx_model.metadata_props.add()
+        prop.key = key
+        prop.value = json.dumps(value)
+    return onnx_model.SerializeToString()
+
+
+def load_session(onnx_model):
+    import onnxruntime as ort
+
+    return ort.InferenceSession(onnx_model, providers=["CPUExecutionProvider"])
+
+
+def onnx_predict_proba(session, X: pd.DataFrame) -> np.ndarray:
+    feature_names = json.loads(session.get_modelmeta().custom_metadata_map["feature_names"])
+    features = np.ascontiguousarray(X[feature_names].to_numpy(dtype=np.float32))
+    return session.run(["probabilities"], {INPUT_NAME: features})[0]
+
+
+def parity_check(model, session, X: pd.DataFrame, atol: float = PARITY_ATOL) -> dict:
+    expected = model.predict_proba(X)
+    actual = onnx_predict_proba(session, X)
+    max_abs_diff = float(np.abs(expected - actual).max())
+    label_mismatches = int((expected.argmax(axis=1) != actual.argmax(axis=1)).sum())
+    return {
+        "rows": len(X),
+        "max_abs_diff": max_abs_diff,
+        "label_mismatches": label_mismatches,
+        "passed": max_abs_diff <= atol and label_mismatches == 0,
+    }
+
+
+def latency_comparison(model, session, X: pd.DataFrame, batch_sizes=(1, 100, 10000), repeats: int = 50) -> dict:
+    """Median milliseconds per predict_proba call for sklearn and onnxruntime, per batch size."""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = X.sample(batch_size, replace=batch_size > len(X), random_state=0)
+        timings = {"sklearn": [], "onnx": []}
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model.predict_proba(batch)
+            timings["sklearn"].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            onnx_predict_proba(session, batch)
+            timings["onnx"].append(time.perf_counter() - started)
+        results[batch_size] = {backend: round(float(np.median(values)) * 1000, 3) for backend, values in timings.items()}
+    return results
+
+
+def log_onnx_model(model, X_sample: pd.DataFrame) -> bool:
+    """Export, check and log the ONNX model into the active run; registration goes ahead without it on failure."""
+    import mlflow
+
+    try:
+        onnx_model = to_onnx(model, X_sample.columns)
+        session = load_session(onnx_model)
+    except Exception as e:
+        print(f"ONNX export skipped for {model.steps[-1][1].__class__.__name__}: {e}")
+        return False
+
+    parity = parity_check(model, session, X_sample)
+    mlflow.log_metric("onnx_max_abs_diff", parity["max_abs_diff"])
+    mlflow.log_metric("onnx_label_mismatches", parity["label_mismatches"])
+    if not parity["passed"]:
+        print(f"ONNX export rejected, outputs differ from sklearn: {parity}")
+        return False
+
+    for batch_size, timings in latency_comparison(model, session, X_sample, repeats=20).items():
+        mlflow.log_metric(f"latency_ms_sklearn_batch_{batch_size}", timings["sklearn"])
+        mlflow.log_metric(f"latency_ms_onnx_batch_{batch_size}", timings["onnx"])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, ONNX_FILE)
+        with open(path, "wb") as file:
+            file.write(onnx_model)
+        mlflow.log_artifact(path, artifact_path=ONNX_ARTIFACT_PATH)
+    print(f"ONNX model logged to {ONNX_ARTIFACT_PATH}/{ONNX_FILE} (max abs diff {parity['max_abs_diff']:.2e})")
+    return True
+
+
+def main():
+    import mlflow
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-uri", default="models:/Employee Attrition Model/Production")
+    parser.add_argument("--tracking-uri", default=os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+    parser.add_argument("--data", required=True, help="Parquet or CSV of preprocessed feature rows")
+    parser.add_argument("--rows", type=int, default=10000, help="rows used for the parity check")
+    args = parser.parse_args()
+
+    mlflow.set_tracking_uri(args.tracking_uri)
+    model = mlflow.sklearn.load_model(args.model_uri)
+    data = pd.read_parquet(args.data) if args.data.endswith(".parquet") else pd.read_csv(args.data)
+    X = data[list(model.feature_names_in_)].head(args.rows)
+
+    session = load_session(to_onnx(model, X.columns))
+    print(f"parity: {parity_check(model, session, X)}")
+    print(f"{'batch':>8} {'sklearn ms':>12} {'onnx ms':>10}")
+    for batch_size, timings in latency_comparison(model, session, X).items():
+        print(f"{batch_size:>8} {timings['sklearn']:>12} {timings['onnx']:>10}")
+
+
+if __name__ == "__main__":
+    main()